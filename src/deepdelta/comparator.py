@@ -1,13 +1,35 @@
+import operator
+import re
 from collections.abc import Collection
 from datetime import datetime
 from decimal import Decimal
-from functools import singledispatch, lru_cache
-from typing import Tuple, Union, Dict, Type, Callable, Any
+from functools import singledispatch, lru_cache, partial
+from typing import Tuple, Union, Dict, Type, Callable, Any, Optional, Pattern
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# marks the comparator of a pair of types that has not been looked up yet
+_UNRESOLVED = object()
+
+# the container types decoded from JSON or commonly used, to avoid checking them against the Collection ABC
+_CONTAINER_TYPES = frozenset({dict, list, tuple, set, frozenset})
+
+# strptime directives of numbers with the regex of the widest numbers accepted for them, any other directive like
+# month names would be matched by anything. The widths are bounded to keep matching adjacent directives like '%Y%m%d'
+# from backtracking without limit
+_NUMERIC_DIRECTIVES = {
+    **dict.fromkeys('dmyHIMSUWV', r' ?\d{1,2}'),
+    **dict.fromkeys('YG', r'\d{1,4}'),
+    'j': r' ?\d{1,3}',
+    'f': r'\d{1,6}',
+    'u': r'\d',
+    'w': r'\d',
+}
+# tokens of a strptime format: directives, whitespaces and other literal characters
+_FORMAT_TOKEN = re.compile(r'%(.)|(\s+)|(.)', re.DOTALL)
+
 
 def as_float_str(value: Union[float, int, Decimal, str], precision: int = None) -> str:
     """Convert float number or its string to float first, then to unified string with specified or default digits.
@@ -16,11 +38,17 @@ def as_float_str(value: Union[float, int, Decimal, str], precision: int = None)
     :param precision: the digits to be reserved for comparison, must be None or positive integer
     :return: string of number rounded with specified or default digits.
     """
-    f_value = float(value)
-    if precision == None:
-        return f"{{:.{Comparator.DEFAULT_FLOAT_PRECISION}f}}".format(f_value)
-    else:
-        return f"{{:.{precision}f}}".format(f_value)
+    return float_format(Comparator.DEFAULT_FLOAT_PRECISION if precision is None else precision)(float(value))
+
+
+@lru_cache
+def float_format(precision: int) -> Callable[[float], str]:
+    """Get the bound format method of the format string with specified digits, to be built only once per precision.
+
+    :param precision: the digits to be reserved, shall be 0 or positive integer
+    :return: the format method to convert a float number to string with the given digits.
+    """
+    return f"{{:.{precision}f}}".format
 
 
 def compare_number_with_precision(lhs: Any, rhs: Any, precision: int = None) -> bool:
@@ -31,7 +59,80 @@ def compare_number_with_precision(lhs: Any, rhs: Any, precision: int = None) ->
     :param precision: the digits to be reserved for comparison, must be None or positive integer
     :return: True if lhs and right in strings with same digits are identical, otherwise False.
     """
-    return as_float_str(lhs, precision) == as_float_str(rhs, precision)
+    if lhs is rhs:
+        return True
+    l_value, r_value = float(lhs), float(rhs)
+    if l_value == r_value:
+        return True
+
+    digits = Comparator.DEFAULT_FLOAT_PRECISION if precision is None else precision
+    # rounding moves a value by half a unit of the last digit at most, so values further apart than one unit can
+    # never get the same string and formatting them can be skipped
+    if abs(l_value - r_value) > unit_of_digits(digits):
+        return False
+    return as_float_str(l_value, digits) == as_float_str(r_value, digits)
+
+
+@lru_cache
+def unit_of_digits(precision: int) -> float:
+    """Get the value of one unit of the last digit with the given precision, like 0.01 for 2 digits.
+
+    :param precision: the digits to be reserved, shall be 0 or positive integer
+    :return: the value of one unit of the last digit.
+    """
+    return 10.0 ** -precision
+
+
+@lru_cache(maxsize=4096)
+def parse_datetime(value: str, formats: Tuple[str, ...]) -> datetime:
+    """Parse the string as datetime with the first matched format, the results are cached since the same strings
+    tend to recur in the values under comparison.
+
+    :param value: the string to be parsed as datetime.
+    :param formats: the formats to be tried in sequence, shall be a tuple to be used as part of the cache key.
+    :return: the datetime parsed with the first format matched with the given string.
+    :raises: ValueError if none of the formats can be used to parse the string.
+    """
+    # the formats before the first one matched by the loose regex would fail anyway
+    match = datetime_formats_regex(formats).fullmatch(value)
+    for f in (formats[match.lastindex - 1:] if match else ()):
+        try:
+            return datetime.strptime(value, f)
+        except ValueError as _:
+            continue
+
+    raise ValueError(f"Cannot get datetime from str: '{value}'")
+
+
+def as_loose_regex(date_format: str) -> str:
+    """Translate a strptime format to a regex matching any string that could be parsed with the format, but the
+    numbers or names are not validated.
+
+    :param date_format: the format to be used by datetime.strptime().
+    :return: the regex pattern string without capturing groups.
+    """
+    pieces = []
+    for directive, spaces, literal in _FORMAT_TOKEN.findall(date_format):
+        if directive:
+            pieces.append(_NUMERIC_DIRECTIVES[directive] if directive in _NUMERIC_DIRECTIVES
+                          else '%' if directive == '%'
+                          else '.+?')
+        elif spaces:
+            pieces.append(r'\s+')
+        else:
+            pieces.append(re.escape(literal))
+    return ''.join(pieces)
+
+
+@lru_cache
+def datetime_formats_regex(formats: Tuple[str, ...]) -> Pattern:
+    """Compile the formats into a single regex with one group per format, then the first format that might parse a
+    string can be found with one matching instead of trying all formats one by one.
+
+    :param formats: the formats to be tried in sequence.
+    :return: the compiled regex whose lastindex of the match denotes the first candidate format.
+    """
+    return re.compile('|'.join(f'({as_loose_regex(f)})' for f in formats), re.IGNORECASE)
 
 
 @lru_cache
@@ -39,9 +140,9 @@ def with_precision(precision: int) -> Callable[[Any, Any], bool]:
     """Higher order function to create a method alike compare_number_with_precision with fixed precision.
 
     :param precision: the digits to be reserved for comparison, shall be 0 or positive integer
-    :return: a method alike compare_number_with_precision with fixed precision.
+    :return: a partial of compare_number_with_precision with fixed precision.
     """
-    return lambda lhs, rhs: compare_number_with_precision(lhs, rhs, precision)
+    return partial(compare_number_with_precision, precision=precision)
 
 
 class Comparator:
@@ -61,7 +162,10 @@ class Comparator:
         :return: True if the given value is in TRUE_VALUES, False if in FALSE_VALUES.
         :raises: ValueError when the given value ssn't contained in either TRUE_VALUES or FALSE_VALUES.
         """
-        if value in Comparator.TRUE_VALUES:
+        # bool values are returned directly without hashing them against the mixed-type sets
+        if value is True or value is False:
+            return value
+        elif value in Comparator.TRUE_VALUES:
             return True
         elif value in Comparator.FALSE_VALUES:
             return False
@@ -101,13 +205,7 @@ class Comparator:
 
         # assume the value is of string type, then expected format must be defined in Comparator.DATETIME_FORMATS
         if isinstance(value, str):
-            for f in Comparator.DATETIME_FORMATS:
-                try:
-                    return datetime.strptime(value, f)
-                except ValueError as _:
-                    continue
-
-            raise ValueError(f"Cannot get datetime from str: '{value}'")
+            return parse_datetime(value, tuple(Comparator.DATETIME_FORMATS))
         # the CUSTOM_TO_DATETIME function can be defined to convert any other value to datetime
         elif Comparator.CUSTOM_TO_DATETIME:
             return Comparator.CUSTOM_TO_DATETIME(value)
@@ -126,6 +224,8 @@ class Comparator:
         :return: True if both converted are equal, otherwise False.
         :raises: ValueError if one cannot be converted.
         """
+        if lhs is rhs:
+            return True
         return Comparator.as_datetime(lhs) == Comparator.as_datetime(rhs)
 
     @staticmethod
@@ -155,11 +255,11 @@ class Comparator:
         :return: True if both converted are equal, otherwise False.
         :raises: ValueError if none of them is string
         """
-        if lhs == None and rhs == None:
+        if lhs is None and rhs is None:
             return True
-        elif lhs == None:
+        elif lhs is None:
             return compare_any_with_none(rhs)
-        elif rhs == None:
+        elif rhs is None:
             return compare_any_with_none(lhs)
         else:
             raise ValueError(f"Either lhs or rhs shall be None")
@@ -176,8 +276,7 @@ def compare_any_with_none(value: Any):
     return not value
 
 
-@singledispatch
-def compare_any_with_str(other: Any, str_value: str) -> bool:
+def compare_str_form_with_str(other: Any, str_value: str) -> bool:
     """Compare any value with a string value in its str() form.
 
     :param other: the other value to be compared with a string.
@@ -187,9 +286,6 @@ def compare_any_with_str(other: Any, str_value: str) -> bool:
     return str(other) == str_value
 
 
-@compare_any_with_str.register(float)
-@compare_any_with_str.register(int)
-@compare_any_with_str.register(Decimal)
 def compare_number_with_str(other: Union[float, Decimal, int], str_value: str) -> bool:
     """Delegate comparison between numbers to NumberComparator.compare.
 
@@ -200,7 +296,6 @@ def compare_number_with_str(other: Union[float, Decimal, int], str_value: str) -
     return compare_number_with_precision(other, str_value)
 
 
-@compare_any_with_str.register(bool)
 def compare_bool_with_str(other: bool, str_value: str) -> bool:
     """Convert the str_value as boolean to compare it with the other bool.
 
@@ -211,7 +306,6 @@ def compare_bool_with_str(other: bool, str_value: str) -> bool:
     return other == Comparator.as_bool(str_value)
 
 
-@compare_any_with_str.register
 def compare_datetime_with_str(other: datetime, str_value: str) -> bool:
     """Convert the str_value as datetime to compare it with the other datetime.
 
@@ -222,6 +316,30 @@ def compare_datetime_with_str(other: datetime, str_value: str) -> bool:
     return other == Comparator.as_datetime(str_value)
 
 
+# the type-based comparators used by compare_any_with_str(), please add concerned type to compare it with a string
+STR_COMPARATORS: Dict[Type, Callable[[Any, str], bool]] = {
+    object: compare_str_form_with_str,
+    int: compare_number_with_str,
+    float: compare_number_with_str,
+    Decimal: compare_number_with_str,
+    bool: compare_bool_with_str,
+    datetime: compare_datetime_with_str,
+}
+
+
+def compare_any_with_str(other: Any, str_value: str) -> bool:
+    """Compare any value with a string value with the comparator of its type or closest base type in STR_COMPARATORS.
+
+    :param other: the other value to be compared with a string.
+    :param str_value: the string value to be compared.
+    :return: True if the other value is treated as equal to the str_value, otherwise False.
+    """
+    comparator = STR_COMPARATORS.get(type(other))
+    if comparator is None:
+        comparator = next(STR_COMPARATORS[cls] for cls in type(other).__mro__ if cls in STR_COMPARATORS)
+    return comparator(other, str_value)
+
+
 # the default type-based comparators
 DEFAULT_TYPE_COMPARATOR: Dict[Union[Tuple[Type, Type], Type], Callable[[Any, Any], bool]] = {
     (int, float): with_precision(0),
@@ -231,36 +349,126 @@ DEFAULT_TYPE_COMPARATOR: Dict[Union[Tuple[Type, Type], Type], Callable[[Any, Any
     (Decimal, str): compare_number_with_precision,
     (float, str): compare_number_with_precision,
     (bool, str): compare_bool_with_str,
+    # two strings are compared directly, the str comparator is only needed when the other value is not a string
+    (str, str): operator.eq,
     str: Comparator.compare_with_str,
     (str, type(None)): Comparator.compare_with_str,
     type(None): Comparator.compare_with_none,
 }
 
 
-def are_equal(lhs: Any, rhs: Any,
-              comparators: Dict[Union[Tuple[Type, Type], Type], Callable[[Any, Any], bool]] = None) -> bool:
-    """Entrance method to compare any two values based on their types that might be different.
+@lru_cache(maxsize=None, typed=True)
+def _is_collection(value_type: Type) -> bool:
+    """Cached issubclass(value_type, Collection) since checking against the ABC is expensive."""
+    return issubclass(value_type, Collection)
 
-    :param lhs: the left value to be compared.
-    :param rhs: the right value to be compared.
-    :param comparators: the type(s) based comparators, copy of DEFAULT_TYPE_COMPARATOR would be used if not specified.
-    :return: True if the left and right value are treated as equal, otherwise False.
+
+def swap_arguments(comparator: Callable[[Any, Any], bool],
+                   swapped: Dict[Callable, Callable] = None) -> Callable[[Any, Any], bool]:
+    """Higher order function to get a comparator accepting its two arguments in reversed order.
+
+    :param comparator: the comparator to be called with (rhs, lhs).
+    :param swapped: optional wrappers created before keyed by their comparators, to share the same wrapper of the
+        same comparator.
+    :return: the wrapper calling the comparator with (rhs, lhs).
     """
-    comparators = comparators or dict(DEFAULT_TYPE_COMPARATOR)
-    l_type, r_type = type(lhs), type(rhs)
-    if (l_type, r_type) in comparators:
+    if swapped is None:
+        return lambda lhs, rhs: comparator(rhs, lhs)
+    wrapper = swapped.get(comparator)
+    if wrapper is None:
+        wrapper = swapped[comparator] = lambda lhs, rhs: comparator(rhs, lhs)
+    return wrapper
+
+
+def lookup_comparator(l_type: Type, r_type: Type,
+                      comparators: Dict[Union[Tuple[Type, Type], Type], Callable[[Any, Any], bool]]) \
+        -> Tuple[Optional[Callable[[Any, Any], bool]], bool]:
+    """Find the comparator to compare values of l_type with values of r_type from the type(s) based comparators.
+
+    The comparators are looked up by (l_type, r_type), (r_type, l_type), l_type and r_type in sequence.
+    :param l_type: type of the left value to be compared.
+    :param r_type: type of the right value to be compared.
+    :param comparators: the type(s) based comparators.
+    :return: tuple of the comparator or None if no comparator is defined, and True if the comparator shall be called
+        with (rhs, lhs) in reversed order.
+    """
+    if l_type is r_type:
+        # values of the same type are most common, and only two lookups are needed for them
+        return comparators.get((l_type, l_type)) or comparators.get(l_type), False
+    elif (l_type, r_type) in comparators:
         if (r_type, l_type) in comparators and comparators[(l_type, r_type)] != comparators[(r_type, l_type)]:
             logger.warning(f"'({l_type}, {r_type})' and '({l_type}, {r_type})' might get different result")
-        return comparators[(l_type, r_type)](lhs, rhs)
+        return comparators[(l_type, r_type)], False
     elif (r_type, l_type) in comparators:
-        return comparators[(r_type, l_type)](rhs, lhs)
+        return comparators[(r_type, l_type)], True
     elif l_type in comparators:
         if r_type in comparators and comparators[l_type] != comparators[r_type]:
             logger.warning(f"Both '{l_type}' and '{r_type}' has comparator defined, be cautious they are different.")
-        return comparators[l_type](lhs, rhs)
+        return comparators[l_type], False
     elif r_type in comparators:
-        return comparators[r_type](rhs, lhs)
-    elif l_type != r_type or issubclass(l_type, Collection):
+        return comparators[r_type], True
+    else:
+        return None, False
+
+
+def get_comparator(l_type: Type, r_type: Type,
+                   comparators: Dict[Union[Tuple[Type, Type], Type], Callable[[Any, Any], bool]],
+                   swapped: Dict[Callable, Callable] = None) -> Optional[Callable[[Any, Any], bool]]:
+    """Find the comparator like lookup_comparator(), and wrap it by swap_arguments() if it accepts (rhs, lhs).
+
+    :param l_type: type of the left value to be compared.
+    :param r_type: type of the right value to be compared.
+    :param comparators: the type(s) based comparators.
+    :param swapped: optional wrappers of swap_arguments() to be shared.
+    :return: the comparator accepting (lhs, rhs) in order, or None if no comparator is defined.
+    """
+    comparator, reversed_order = lookup_comparator(l_type, r_type, comparators)
+    return swap_arguments(comparator, swapped) if reversed_order else comparator
+
+
+def expand_comparators(comparators: Dict[Union[Tuple[Type, Type], Type], Callable[[Any, Any], bool]],
+                       swapped: Dict[Callable, Callable] = None) -> Dict[Tuple[Type, Type], Callable[[Any, Any], bool]]:
+    """Materialize the comparators of pairs of types in both orders, the mirrored ones would swap their arguments.
+
+    :param comparators: the type(s) based comparators.
+    :param swapped: optional wrappers of swap_arguments() to be shared.
+    :return: dict of comparators keyed by (l_type, r_type) accepting (lhs, rhs) in order, the comparators of single
+        type are not included.
+    """
+    expanded = {}
+    for types, comparator in comparators.items():
+        if not isinstance(types, tuple):
+            continue
+        l_type, r_type = types
+        expanded[types] = comparator
+        if (r_type, l_type) not in comparators:
+            expanded[(r_type, l_type)] = swap_arguments(comparator, swapped)
+        elif l_type is not r_type and comparators[(r_type, l_type)] != comparator:
+            logger.warning(f"'({l_type}, {r_type})' and '({r_type}, {l_type})' might get different result")
+    return expanded
+
+
+def are_equal(lhs: Any, rhs: Any,
+              comparators: Dict[Union[Tuple[Type, Type], Type], Callable[[Any, Any], bool]] = None) -> bool:
+    """Entrance method to compare any two values based on their types that might be different.
+
+    :param lhs: the left value to be compared.
+    :param rhs: the right value to be compared.
+    :param comparators: the type(s) based comparators, DEFAULT_TYPE_COMPARATOR would be used if not specified.
+    :return: True if the left and right value are treated as equal, otherwise False.
+    """
+    # the same object is always equal to itself, no matter of its type
+    if lhs is rhs:
+        return True
+
+    # the comparators are only read here, so DEFAULT_TYPE_COMPARATOR can be used without copying it
+    comparators = comparators if comparators is not None else DEFAULT_TYPE_COMPARATOR
+    l_type, r_type = type(lhs), type(rhs)
+    # the comparator found is called once only, so it is called in reversed order directly without being wrapped
+    comparator, reversed_order = lookup_comparator(l_type, r_type, comparators)
+    if comparator:
+        return comparator(rhs, lhs) if reversed_order else comparator(lhs, rhs)
+    elif l_type is not r_type or l_type in _CONTAINER_TYPES or _is_collection(l_type):
         return NotImplemented
     else:
         return lhs == rhs
@@ -270,11 +478,13 @@ def with_comparators(comparators: Dict[Union[Tuple[Type, Type], Type], Callable[
                      none_dif_default: bool = False) -> Callable[[Any, Any], bool]:
     """Higher order function to create a method to compare any two objects based on their types.
 
+    The comparators of pairs of types are expanded in both orders when creating the method, comparators of other
+    (l_type, r_type) pairs are resolved once, then all of them are retrieved with a single lookup.
     :param comparators: the optional types-based comparators, default as copy of the current DEFAULT_TYPE_COMPARATOR
     :param none_dif_default: effective only when comparators is None:
         if True: exclude NoneTypefrom the copy of DEFAULT_TYPE_COMPARATOR, and make comparing str with None as False;
         if False: avoid in-consistence of comparing str and None
-    :return: a are_equal(lhs, rhs, comparators) with typed comparators.
+    :return: a method alike are_equal(lhs, rhs, comparators) with typed comparators.
     """
     if not comparators:
         comparators = dict(DEFAULT_TYPE_COMPARATOR)
@@ -283,5 +493,27 @@ def with_comparators(comparators: Dict[Union[Tuple[Type, Type], Type], Callable[
             comparators[(str, type(None))] = lambda lhs, rhs: False
         else:
             comparators[(str, type(None))] = lambda lhs, rhs: not lhs and not rhs
-    return lambda lhs, rhs: are_equal(lhs, rhs, comparators)
+    else:
+        comparators = dict(comparators)
+
+    # (l_type, r_type) -> the comparator accepting (lhs, rhs) in order, or None if no comparator is defined.
+    # pairs of types are materialized in both orders up front, pairs involving single type keys are resolved lazily
+    # the wrappers of swapped comparators are shared only by this method, so they are released together with it
+    swapped: Dict[Callable, Callable] = {}
+    resolved: Dict[Tuple[Type, Type], Optional[Callable[[Any, Any], bool]]] = expand_comparators(comparators, swapped)
+
+    def typed_equal(lhs: Any, rhs: Any) -> bool:
+        if lhs is rhs:
+            return True
+        l_type, r_type = type(lhs), type(rhs)
+        comparator = resolved.get((l_type, r_type), _UNRESOLVED)
+        if comparator is _UNRESOLVED:
+            comparator = resolved[(l_type, r_type)] = get_comparator(l_type, r_type, comparators, swapped)
+        if comparator:
+            return comparator(lhs, rhs)
+        elif l_type is not r_type or l_type in _CONTAINER_TYPES or _is_collection(l_type):
+            return NotImplemented
+        else:
+            return lhs == rhs
 
+    return typed_equal
@@ -1,14 +1,16 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-from datetime import datetime, date
+from datetime import date
+import operator
 import re
 from decimal import Decimal
-from functools import singledispatch
-from typing import List, Tuple, Pattern, Union, Any, Mapping, Dict, Sequence, Callable, Set, Type, Collection
+from functools import lru_cache
+from typing import List, Tuple, Pattern, Union, Any, Mapping, Dict, Sequence, Callable, Set, Type, Collection, \
+    Optional
 
 from deepdelta.comparator import with_comparators
 from deepdelta.delta_config import DeltaConfig
-from deepdelta.delta_output import get_output
+from deepdelta.delta_output import get_output, get_emitter
 
 # from .delta_config import DeltaConfig
 # from .comparator import DEFAULT_TYPE_COMPARATOR, Comparator
@@ -33,7 +35,6 @@ DEFAULT_DELTA_CONFIG: DeltaConfig = DeltaConfig.CaseIgnored\
                                     | DeltaConfig.OutputDefault
 
 
-@singledispatch
 def key_matches(kp, key_path: str, case_ignored=False) -> bool:
     """With a given key path, check if the concerned key is matched or not.
 
@@ -41,25 +42,30 @@ def key_matches(kp, key_path: str, case_ignored=False) -> bool:
     :param key_path: The key path used to get the right keys, shall be in form of '>key1', '>k1>k2' and etc.
     :param case_ignored: True for case in-sensitive comparison, False for case sensitive.
     :return: True if the given Key string or Pattern matched with the key path, otherwise False.
-    :raises: TypeError if the kp is not re.Pattern or str.
     """
-    return key_matches(str(kp), key_path, case_ignored)
+    # exact types are looked up first since subclasses are rare
+    matches = _KEY_MATCHERS.get(type(kp))
+    if matches is not None:
+        return matches(kp, key_path, case_ignored)
+    elif isinstance(kp, tuple):
+        return _key_matches_tuple(kp, key_path, case_ignored)
+    elif isinstance(kp, str):
+        return _key_matches_str(kp, key_path, case_ignored)
+    else:
+        return _key_matches_str(str(kp), key_path, case_ignored)
 
 
-@key_matches.register(tuple)
-def _(tpl: Tuple, key_path: str, case_ignored=False) -> bool:
+def _key_matches_tuple(tpl: Tuple, key_path: str, case_ignored=False) -> bool:
     """Called when the concerned Key is defined as a tuple to see if they are matched."""
     return normalize(tpl, case_ignored) == key_path
 
 
-@key_matches.register(re.Pattern)
-def _(pattern, key_path: str, case_ignored=False) -> bool:
+def _key_matches_pattern(pattern, key_path: str, case_ignored=False) -> bool:
     """Called when the concerned Key is defined as a re.Pattern, and case_ignored flag is neglected."""
-    return re.fullmatch(pattern, key_path) is not None
+    return pattern.fullmatch(key_path) is not None
 
 
-@key_matches.register(str)
-def _(key, key_path: str, case_ignored=False) -> bool:
+def _key_matches_str(key, key_path: str, case_ignored=False) -> bool:
     """Called when the concerned Key is of str type to see if it matched with the given key path.
 
     :param key: Key string to be matched with 3 forms: 'name', '>root>branch>leaf' or 'grandpa>parent>child'
@@ -71,19 +77,278 @@ def _(key, key_path: str, case_ignored=False) -> bool:
         2) key of full path '>root>branch>leaf': defines a full path thus compare all of key_path.
         3) key of partial path 'p>child': to match multiple cases like ">root1>p>child' & '>root2>gpa>p>child'
     """
-    if DeepDelta.PATH_SEPARATOR not in key:
-        last_key = key_path.split(DeepDelta.PATH_SEPARATOR)[-1]
+    separator = DeepDelta.PATH_SEPARATOR
+    if separator not in key:
+        last_key = key_path.rpartition(separator)[2]
         return key.casefold() == last_key.casefold() \
             if case_ignored \
             else key == last_key
-    elif key[0] == DeepDelta.PATH_SEPARATOR:
+    elif key[0] == separator:
         return key.casefold() == key_path.casefold() \
             if case_ignored \
             else key == key_path
+    elif not case_ignored:
+        return key_path.endswith(key)
+    elif key.isascii() and key_path.isascii():
+        # casefold() keeps the length of ASCII strings, so only the tail of key_path needs to be folded
+        return len(key_path) >= len(key) and key_path[-len(key):].lower() == key.lower()
     else:
-        return key_path.casefold().endswith(key.casefold()) \
-            if case_ignored \
-            else key_path.endswith(key)
+        return key_path.casefold().endswith(key.casefold())
+
+
+_REGEX_META_CHARS = frozenset('.^$*+?{}[]\\|()')
+
+
+def literal_prefix(pattern: Pattern) -> str:
+    """Get the ASCII literal that any string fully matched by the pattern must start with.
+
+    :param pattern: the compiled regex pattern.
+    :return: the literal prefix, or '' if it cannot be told safely.
+    """
+    source = pattern.pattern
+    if not isinstance(source, str) or pattern.flags & re.VERBOSE or '|' in source:
+        return ''
+    start = 1 if source.startswith('^') else 0
+    end = start
+    while end < len(source) and source[end] not in _REGEX_META_CHARS:
+        end += 1
+    if end < len(source) and source[end] in '*?{':
+        # the last literal char is optional or repeated for unknown times
+        end -= 1
+    prefix = source[start:max(start, end)]
+    return prefix if prefix.isascii() else ''
+
+
+def exact_literal(pattern: Pattern) -> Optional[str]:
+    """Get the ASCII string, like '>KEY1' of '^>KEY1$', that is the only one fully matched by a case sensitive pattern.
+
+    :param pattern: the compiled regex pattern.
+    :return: the literal matched by the pattern, or None if the pattern is not a plain literal.
+    """
+    source = pattern.pattern
+    if not isinstance(source, str) or pattern.flags & re.VERBOSE:
+        return None
+    start = 1 if source.startswith('^') else 0
+    end = len(source) - 1 if source.endswith('$') else len(source)
+    literal = source[start:end]
+    if not literal or not literal.isascii() or any(c in _REGEX_META_CHARS for c in literal):
+        return None
+    return literal
+
+
+def _compile_pattern_matcher(pattern: Pattern) -> Callable[[str, str], bool]:
+    """Get the predicate of the Pattern for compile_key_matcher(), which rejects the key paths not starting with the
+    literal prefix of the pattern without running the regex engine.
+    """
+    prefix = literal_prefix(pattern)
+    if not prefix:
+        return lambda key_path, folded_path: pattern.fullmatch(key_path) is not None
+    elif not pattern.flags & re.IGNORECASE:
+        return lambda key_path, folded_path: key_path.startswith(prefix) and pattern.fullmatch(key_path) is not None
+
+    size, lower_prefix = len(prefix), prefix.lower()
+
+    def matches(key_path: str, folded_path: str) -> bool:
+        head = key_path[:size]
+        # IGNORECASE matches some non-ASCII chars with ASCII ones, like 'ſ' with 's', so leave them to the regex
+        if head.isascii() and head.lower() != lower_prefix:
+            return False
+        return pattern.fullmatch(key_path) is not None
+
+    return matches
+
+
+# the functions to match a key path with the keys of these exact types
+_KEY_MATCHERS: Dict[Type, Callable[[Any, str, bool], bool]] = {
+    str: _key_matches_str,
+    re.Pattern: _key_matches_pattern,
+    tuple: _key_matches_tuple,
+}
+
+
+def compile_key_matcher(kp, case_ignored: bool = False) -> Callable[[str, str], bool]:
+    """Prepare the key string or Pattern once to get a predicate behaving like key_matches(kp, key_path, case_ignored).
+
+    :param kp: Key string or Pattern to be matched.
+    :param case_ignored: True for case in-sensitive comparison, False for case sensitive.
+    :return: predicate accepting (key_path, folded_path) where the folded_path shall be key_path.casefold() if
+        case_ignored is True, otherwise the key_path itself.
+    """
+    kp_type = type(kp)
+    if kp_type is re.Pattern:
+        return _compile_pattern_matcher(kp)
+    elif isinstance(kp, tuple):
+        normalized = normalize(kp, case_ignored)
+        return lambda key_path, folded_path: normalized == key_path
+    elif not isinstance(kp, str):
+        return compile_key_matcher(str(kp), case_ignored)
+
+    separator = DeepDelta.PATH_SEPARATOR
+    key = kp.casefold() if case_ignored else kp
+    if separator not in key:
+        return lambda key_path, folded_path: folded_path.rpartition(separator)[2] == key
+    elif key[0] == separator:
+        return lambda key_path, folded_path: folded_path == key
+    else:
+        return lambda key_path, folded_path: folded_path.endswith(key)
+
+
+# inline flags that can be scoped to one alternative of a union regex like '(?i:...)'
+_SCOPED_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'))
+_UNION_COMPATIBLE_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL | re.UNICODE
+
+
+def _as_union_member(pattern: Pattern) -> Optional[str]:
+    """Get the source of the pattern with its flags inlined, or None if it cannot be merged with other patterns."""
+    if not isinstance(pattern.pattern, str) or pattern.groups or pattern.flags & ~_UNION_COMPATIBLE_FLAGS:
+        return None
+    inline_flags = ''.join(letter for flag, letter in _SCOPED_FLAGS if pattern.flags & flag)
+    member = f'(?{inline_flags}:{pattern.pattern})' if inline_flags else f'(?:{pattern.pattern})'
+    try:
+        # global inline flags like '(?i)abc' are only valid at the start of the whole expression
+        re.compile(member)
+    except re.error:
+        return None
+    return member
+
+
+def compile_keys_matcher(kps: Sequence, case_ignored: bool = False) -> Callable[[str, str], bool]:
+    """Prepare the key strings or Patterns once to get a predicate telling if any of them matches a key path, like
+    any(key_matches(kp, key_path, case_ignored) for kp in kps).
+
+    Keys of the same form are merged: names and full paths into sets, partial paths into a tuple of suffixes and
+    Patterns without groups into a single alternation, so the cost does not grow with the number of keys.
+
+    :param kps: Key strings or Patterns to be matched.
+    :param case_ignored: True for case in-sensitive comparison, False for case sensitive.
+    :return: predicate accepting (key_path, folded_path) where the folded_path shall be key_path.casefold() if
+        case_ignored is True, otherwise the key_path itself.
+    """
+    separator = DeepDelta.PATH_SEPARATOR
+    names, paths, suffixes, union_members, matchers = set(), set(), [], [], []
+    for kp in kps:
+        if type(kp) is re.Pattern:
+            member = _as_union_member(kp)
+            if member is None:
+                matchers.append(compile_key_matcher(kp, case_ignored))
+            else:
+                union_members.append(member)
+            continue
+        elif isinstance(kp, tuple):
+            matchers.append(compile_key_matcher(kp, case_ignored))
+            continue
+
+        key = kp if isinstance(kp, str) else str(kp)
+        key = key.casefold() if case_ignored else key
+        if separator not in key:
+            names.add(key)
+        elif key[0] == separator:
+            paths.add(key)
+        else:
+            suffixes.append(key)
+
+    suffixes = tuple(suffixes)
+    union = re.compile('|'.join(union_members)).fullmatch if union_members else None
+
+    def matches(key_path: str, folded_path: str) -> bool:
+        return bool((names and folded_path.rpartition(separator)[2] in names)
+                    or (paths and folded_path in paths)
+                    or (suffixes and folded_path.endswith(suffixes))
+                    or (union and union(key_path) is not None)
+                    or any(m(key_path, folded_path) for m in matchers))
+
+    return matches
+
+
+@lru_cache(maxsize=256)
+def _indexed_keys_of(kps: Tuple, kp_types: Tuple, case_ignored: bool, separator: str) -> Tuple:
+    """Index the keys by their positions to find the matched ones of a key path without testing all of them.
+
+    Patterns of plain literals like '^>KEY1$' are indexed by their literals, since they can only match one key path
+    when the case is not ignored, or the key paths of the same lower case ASCII chars otherwise.
+
+    :param kps: Key strings or Patterns to be matched.
+    :param kp_types: types of the kps, to tell apart the keys like (1,), (True,) and (1.0,) that are equal as tuples.
+    :param case_ignored: True for case in-sensitive comparison, False for case sensitive.
+    :param separator: the DeepDelta.PATH_SEPARATOR the keys are indexed with.
+    :return: tuple of the positions of names keyed by the names, the positions of full paths keyed by the paths, the
+        positions of partial paths keyed by the paths and all the partial paths, the positions of literal Patterns keyed
+        by the literals or their lower cases with the IGNORECASE ones, and the positions with the predicates of
+        compile_key_matcher() of other keys.
+    """
+    by_name, by_path, suffixes, by_literal, by_lower_literal, case_ignored_literals, others = \
+        {}, {}, {}, {}, {}, [], []
+    for i, kp in enumerate(kps):
+        if type(kp) is re.Pattern:
+            literal = exact_literal(kp)
+            if literal is None:
+                others.append((i, compile_key_matcher(kp, case_ignored)))
+            elif not kp.flags & re.IGNORECASE:
+                by_literal.setdefault(literal, []).append(i)
+            else:
+                by_lower_literal.setdefault(literal.lower(), []).append(i)
+                case_ignored_literals.append((i, kp))
+            continue
+        elif isinstance(kp, str):
+            key = kp.casefold() if case_ignored else kp
+            if separator not in key:
+                by_name.setdefault(key, []).append(i)
+                continue
+            elif key[0] == separator:
+                by_path.setdefault(key, []).append(i)
+            else:
+                suffixes.setdefault(key, []).append(i)
+            continue
+        others.append((i, compile_key_matcher(kp, case_ignored)))
+    return by_name, by_path, suffixes, tuple(suffixes), by_literal, by_lower_literal, case_ignored_literals, others
+
+
+def _cached_indexed_keys(kps: Tuple, case_ignored: bool) -> Optional[Tuple]:
+    """Get the cached index of the keys if all of them are hashable, otherwise None."""
+    try:
+        return _indexed_keys_of(kps, tuple(map(type, kps)), case_ignored, DeepDelta.PATH_SEPARATOR)
+    except TypeError:
+        return None
+
+
+def _matched_indexes(normalized: str, indexed: Tuple, case_ignored: bool, any_only: bool = False) -> List[int]:
+    """Get the positions of the keys indexed by _indexed_keys_of() that match the normalized key path.
+
+    :param normalized: the key path normalized by normalize().
+    :param indexed: the keys indexed by _indexed_keys_of().
+    :param case_ignored: True for case in-sensitive comparison, False for case sensitive.
+    :param any_only: True to skip the keys that cannot be looked up once any of the others is matched.
+    :return: positions of the matched keys, not sorted.
+    """
+    folded = normalized.casefold() if case_ignored else normalized
+    by_name, by_path, suffixes, all_suffixes, by_literal, by_lower_literal, case_ignored_literals, others = indexed
+    indexes = by_name.get(folded.rpartition(DeepDelta.PATH_SEPARATOR)[2], []) + by_path.get(folded, []) \
+        + by_literal.get(normalized, [])
+    if case_ignored_literals and normalized.isascii():
+        indexes += by_lower_literal.get(normalized.lower(), [])
+    elif case_ignored_literals:
+        # IGNORECASE matches some non-ASCII chars with ASCII ones, like the Kelvin sign with 'k'
+        indexes += [i for i, pattern in case_ignored_literals if pattern.fullmatch(normalized) is not None]
+    # a single endswith() with all the suffixes tells if any of the partial paths needs to be checked
+    if all_suffixes and folded.endswith(all_suffixes):
+        indexes += [i for suffix, positions in suffixes.items() if folded.endswith(suffix) for i in positions]
+    if any_only and indexes:
+        return indexes
+    elif any_only:
+        return next(([i] for i, matches in others if matches(normalized, folded)), [])
+    return indexes + [i for i, matches in others if matches(normalized, folded)]
+
+
+def _indexed_or_none(normalized: Any, all_keys: Sequence, case_ignored: bool) -> Tuple[Sequence, Optional[Tuple]]:
+    """Get the keys as a tuple with their index if the normalized key path is a str and all keys are hashable,
+    otherwise the keys as they are with None.
+    """
+    # the same keys are usually matched against many key paths, like the candidates of get_matched_keys(), so they
+    # are folded and indexed once as a tuple
+    if type(normalized) is not str:
+        return all_keys, None
+    all_keys = all_keys if type(all_keys) is tuple else tuple(all_keys)
+    return all_keys, _cached_indexed_keys(all_keys, case_ignored)
 
 
 def matched_keys(key_path: Any, all_keys: Sequence, case_ignored: bool, space_trimmed: bool = False) -> List:
@@ -96,15 +361,50 @@ def matched_keys(key_path: Any, all_keys: Sequence, case_ignored: bool, space_tr
     :return: list of all keys of the all_keys matched with the given key_path.
     """
     normalized = normalize(key_path, case_ignored, space_trimmed)
-    keys = [k for k in all_keys if key_matches(k, normalized, case_ignored)]
+    all_keys, indexed = _indexed_or_none(normalized, all_keys, case_ignored)
+    if indexed:
+        keys = [all_keys[i] for i in sorted(_matched_indexes(normalized, indexed, case_ignored))]
+    else:
+        keys = [k for k in all_keys if key_matches(k, normalized, case_ignored)]
 
     if len(keys) > 1:
         logger.warning(f"Multiple matching of '{key_path}': {','.join((str(k) for k in keys))}")
     return keys
 
 
-@singledispatch
-def normalize(key, case_ignored: bool = False, space_trimmed: bool = False) -> str:
+def matched_keys_count(key_path: Any, all_keys: Sequence, case_ignored: bool, space_trimmed: bool = False) -> int:
+    """Count the keys matched with the key_path like len(matched_keys(...)) without collecting them or logging.
+
+    :param key_path: the concerned key in forms like '>root>parent>name' or '>name'
+    :param all_keys: the scope of keys that shall be either str or re.Pattern.
+    :param case_ignored: True for case in-sensitive comparison, False for case sensitive.
+    :param space_trimmed: Trim the leading&ending spaces if True, otherwise False.
+    :return: number of the keys of the all_keys matched with the given key_path.
+    """
+    normalized = normalize(key_path, case_ignored, space_trimmed)
+    all_keys, indexed = _indexed_or_none(normalized, all_keys, case_ignored)
+    if indexed:
+        return len(_matched_indexes(normalized, indexed, case_ignored))
+    return sum(1 for k in all_keys if key_matches(k, normalized, case_ignored))
+
+
+def any_matched_key(key_path: Any, all_keys: Sequence, case_ignored: bool, space_trimmed: bool = False) -> bool:
+    """Tell if any key is matched with the key_path like bool(matched_keys(...)), and stop once one is found.
+
+    :param key_path: the concerned key in forms like '>root>parent>name' or '>name'
+    :param all_keys: the scope of keys that shall be either str or re.Pattern.
+    :param case_ignored: True for case in-sensitive comparison, False for case sensitive.
+    :param space_trimmed: Trim the leading&ending spaces if True, otherwise False.
+    :return: True if any key of the all_keys is matched with the given key_path, otherwise False.
+    """
+    normalized = normalize(key_path, case_ignored, space_trimmed)
+    all_keys, indexed = _indexed_or_none(normalized, all_keys, case_ignored)
+    if indexed:
+        return bool(_matched_indexes(normalized, indexed, case_ignored, True))
+    return any(key_matches(k, normalized, case_ignored) for k in all_keys)
+
+
+def normalize(key, case_ignored: bool = False, space_trimmed: bool = False) -> Union[str, Tuple]:
     """Normalize a key to a string with optional case_ignored or space_trimmed.
 
     :param key: the key to be normalized, can be any type
@@ -112,11 +412,27 @@ def normalize(key, case_ignored: bool = False, space_trimmed: bool = False) -> s
     :param space_trimmed: Trim the leading&ending spaces if True, otherwise False.
     :return: str(key) by default with case_ignored and space_trimmed applied.
     """
-    return normalize(str(key), case_ignored, space_trimmed)
+    # exact types are checked first since subclasses are rare, and str keys are the most common
+    key_type = type(key)
+    if key_type is str:
+        return _normalize_str(key, case_ignored, space_trimmed)
+    elif key_type is int:
+        return str(key)
+    elif key_type is tuple:
+        return _normalize_tuple(key, case_ignored, space_trimmed)
+    elif isinstance(key, str):
+        return _normalize_str(key, case_ignored, space_trimmed)
+    elif isinstance(key, tuple):
+        return _normalize_tuple(key, case_ignored, space_trimmed)
+    elif isinstance(key, date):
+        return _normalize_date(key, case_ignored, space_trimmed)
+    elif isinstance(key, (float, Decimal)):
+        return _normalize_float(key, case_ignored, space_trimmed)
+    else:
+        return _normalize_str(str(key), case_ignored, space_trimmed)
 
 
-@normalize.register(tuple)
-def _(tpl: Tuple, case_ignored: bool = False, space_trimmed: bool = False) -> Tuple:
+def _normalize_tuple(tpl: Tuple, case_ignored: bool = False, space_trimmed: bool = False) -> Tuple:
     """Normalize a tuple with optional case_ignored or space_trimmed.
 
     :param tpl: the key of tuple type.
@@ -127,8 +443,7 @@ def _(tpl: Tuple, case_ignored: bool = False, space_trimmed: bool = False) -> Tu
     return tuple(normalize(item, case_ignored, space_trimmed) for item in tpl)
 
 
-@normalize.register(str)
-def _(str_key: str, case_ignored: bool = False, space_trimmed: bool = False) -> str:
+def _normalize_str(str_key: str, case_ignored: bool = False, space_trimmed: bool = False) -> str:
     """Normalize a string with optional case_ignored or space_trimmed.
 
     :param str_key: the key of str type.
@@ -136,13 +451,20 @@ def _(str_key: str, case_ignored: bool = False, space_trimmed: bool = False) ->
     :param space_trimmed: Trim the leading&ending spaces if True, otherwise False.
     :return: str(key) by default with case_ignored and space_trimmed applied.
     """
-    cased_key = str_key.casefold() if case_ignored else str_key
+    if case_ignored:
+        # lower() is cheaper than casefold() and gets the same result for ASCII-only keys
+        cased_key = str_key.lower() if str_key.isascii() else str_key.casefold()
+    else:
+        cased_key = str_key
     return cased_key.strip() if space_trimmed else cased_key
 
 
-@normalize.register(date)
-@normalize.register(datetime)
-def _(date_key, case_ignored: bool = False, space_trimmed: bool = False) -> str:
+# the default DeepDelta.DEFAULT_DATE_FORMAT, and the month abbreviations it renders by %b
+_YEAR_MONTH_DAY = '%Y-%b-%d'
+_MONTH_ABBREVIATIONS = ('',) + tuple(date(2000, month, 1).strftime('%b') for month in range(1, 13))
+
+
+def _normalize_date(date_key, case_ignored: bool = False, space_trimmed: bool = False) -> str:
     """Normalize a key of date or datetime type with format of DeepDelta.DEFAULT_DATE_FORMAT,
     then change case or strip as instructed.
 
@@ -151,13 +473,15 @@ def _(date_key, case_ignored: bool = False, space_trimmed: bool = False) -> str:
     :param space_trimmed: Trim the leading&ending spaces if True, otherwise False.
     :return: str(key) by default with case_ignored and space_trimmed applied.
     """
-    str_key = date_key.strftime(DeepDelta.DEFAULT_DATE_FORMAT)
-    return normalize(str_key, case_ignored, space_trimmed)
+    if DeepDelta.DEFAULT_DATE_FORMAT == _YEAR_MONTH_DAY and date_key.year >= 1000:
+        # same output as strftime() for the default format without its per-call overhead
+        str_key = f'{date_key.year}-{_MONTH_ABBREVIATIONS[date_key.month]}-{date_key.day:02d}'
+    else:
+        str_key = date_key.strftime(DeepDelta.DEFAULT_DATE_FORMAT)
+    return _normalize_str(str_key, case_ignored, space_trimmed)
 
 
-@normalize.register(float)
-@normalize.register(Decimal)
-def _(float_key, case_ignored: bool = False, space_trimmed: bool = False) -> str:
+def _normalize_float(float_key, case_ignored: bool = False, space_trimmed: bool = False) -> str:
     """Normalize a float number to string with fixed digits left.
 
     :param date_key: the key of date or datetime type.
@@ -175,10 +499,21 @@ def key_denoted_by_id(name: Any, case_ignored: bool = False) -> bool:
     :param case_ignored: True for case in-sensitive comparison, False for case sensitive.
     :return: True if the given name starts/ends with 'id', otherwise False.
     """
+    if type(name) is str:
+        return _str_denoted_by_id(name, case_ignored)
     name_str = normalize(name, case_ignored, True)
     return name_str.endswith('id') or name_str.startswith('id')
 
 
+# the same names are evaluated again for every sequence of dicts or objects of the same keys, only str names are cached
+# since names of other types are normalized with the formats of DeepDelta that can be changed
+@lru_cache(maxsize=1024)
+def _str_denoted_by_id(name: str, case_ignored: bool) -> bool:
+    """key_denoted_by_id() of a name of str type."""
+    name_str = _normalize_str(name, case_ignored, True)
+    return name_str.endswith('id') or name_str.startswith('id')
+
+
 def get_matched_keys(candidates: set, is_key: Callable = None, case_ignored: bool = True, *keys: List) -> Set:
     """Filter with predicate or known keys to get the matched keys from the candidates in sequence below:
     1) If keys are given, then find them from the candidates with case_ignored flag and trim the spaces.
@@ -212,30 +547,48 @@ def guess_keys(seq: Sequence, is_key: Callable = None, case_ignored: bool = True
     if not seq:
         # empty sequence: return whatever set
         return set(keys)
-    items = list(seq)
-    item_types = {type(item) for item in items}
-    if len(item_types) != 1:
-        return {}
-        # raise TypeError(f"Sequence with different items of {','.join(item_types)} is not supported.")
-
-    item_type = item_types.pop()
+    items = iter(seq)
+    first = next(items)
+    item_type = type(first)
     if issubclass(item_type, Mapping):
-        key_sets = [set(item.keys()) for item in items]
-        shared_keys = set.intersection(*key_sets)
-    else: # if hasattr(item_type, '__dict__'):
-        if len(items) > 0 and hasattr(items[0], '__dict__'):
-            key_sets = [set(item.__dict__.keys()) for item in items]
-            shared_keys = set.intersection(*key_sets)
-        else:
-            shared_keys = {}
+        get_keys = item_type.keys
+    elif hasattr(first, '__dict__'):
+        get_keys = vars
+    else:
+        get_keys = None
+
+    shared_keys = set(get_keys(first)) if get_keys else set()
+    for item in items:
+        if type(item) is not item_type:
+            return set()
+        if shared_keys:
+            shared_keys.intersection_update(get_keys(item))
 
     # else:
     #     d = {i: items[i] for i in range(0, len(items))}
     #     shared_keys = d.keys()
 
+    if (keys or is_key is None or is_key is key_denoted_by_id) and all(type(k) is str for k in shared_keys):
+        # only the results of the known pure predicates are cached, and the predicate is never evaluated when the keys
+        # are specified, so any of them shares the same cached result. Names of other types are not cached since
+        # sets like {1} and {True} are equal
+        try:
+            return set(_cached_matched_keys(frozenset(shared_keys), None if keys else is_key, case_ignored, keys,
+                                            tuple(map(type, keys))))
+        except TypeError:
+            # unhashable keys
+            pass
     return get_matched_keys(shared_keys, is_key, case_ignored, *keys)
 
 
+@lru_cache(maxsize=256)
+def _cached_matched_keys(candidates: frozenset, is_key: Optional[Callable], case_ignored: bool,
+                         keys: Tuple, key_types: Tuple) -> frozenset:
+    """get_matched_keys() of the same fields shared by sequences of dicts or objects of the same class, where the
+    key_types tell apart the keys equal as tuples like (1,) and (True,)."""
+    return frozenset(get_matched_keys(candidates, is_key, case_ignored, *keys))
+
+
 def sequence_to_dict(seq: Sequence, is_key: Callable = None, case_ignored: bool = True, *keys: List[Any]) -> Dict:
     """Convert the given sequence of either dict or instances of same class to a dict by extract their keys.
 
@@ -246,22 +599,54 @@ def sequence_to_dict(seq: Sequence, is_key: Callable = None, case_ignored: bool
     :return: a dict with keys extracted from the items of the sequence.
     """
 
-    keys = list(guess_keys(seq, is_key, case_ignored, *keys))
-    items = list(seq)
-    item_type = type(items[0])
+    items = seq if isinstance(seq, list) else list(seq)
+    keys = list(guess_keys(items, is_key, case_ignored, *keys))
     if len(keys) == 0:
         return {str(i): items[i] for i in range(len(items))}
-    elif len(keys) == 1:
-        if issubclass(item_type, Mapping):
-            return {item[keys[0]]: item for item in items}
-        else:
-            return {item.__dict__[keys[0]]: vars(item) for item in items}
+
+    keys.sort()
+    # itemgetter of a single key returns its value, and the tuple of the values of multiple keys
+    get_key = operator.itemgetter(*keys)
+    if issubclass(type(items[0]), Mapping):
+        return {get_key(item): item for item in items}
     else:
-        keys.sort()
-        if issubclass(item_type, Mapping):
-            return {tuple(item[k] for k in keys): item for item in items}
-        else:
-            return {tuple(item.__dict__[k] for k in keys): vars(item) for item in items}
+        return {get_key(attributes): attributes for attributes in map(vars, items)}
+
+
+def str_differ_of(case_ignored: bool, space_trimmed: bool) -> Callable[[str, str], bool]:
+    """Get the predicate to tell if two strings are different with the case and spaces handled as instructed.
+
+    :param case_ignored: True for case in-sensitive comparison, False for case sensitive.
+    :param space_trimmed: Trim the leading&ending spaces if True, otherwise False.
+    :return: predicate returning True if the two strings are regarded as different, otherwise False.
+    """
+    if case_ignored:
+        return (lambda l, r: l.strip().casefold() != r.strip().casefold()) if space_trimmed \
+            else (lambda l, r: l.casefold() != r.casefold())
+    else:
+        return (lambda l, r: l.strip() != r.strip()) if space_trimmed else operator.ne
+
+
+def _no_named_comparator(key_path: str) -> None:
+    """Used by DeepDelta instances without any named comparators."""
+    return None
+
+
+def _not_excluded(key_path: str) -> bool:
+    """Used by DeepDelta instances without any excluded keys."""
+    return False
+
+
+class _Nested:
+    """Two dicts, or two dicts converted from sequences, to be compared by DeepDelta.compare_dict() under a key path."""
+    __slots__ = ('lhs', 'rhs', 'path')
+
+    def __init__(self, lhs: Mapping, rhs: Mapping, path: str):
+        self.lhs, self.rhs, self.path = lhs, rhs, path
+
+
+# denotes a key absent from one of the compared dicts, since None itself can be a key
+_ABSENT = object()
 
 
 class DeepDelta:
@@ -273,6 +658,8 @@ class DeepDelta:
     MISSING = 'MISSING'
     DEFAULT_DATE_FORMAT = '%Y-%b-%d'
     DEFAULT_FLOAT_NUMBER_DIGITS = 2
+    # the max number of key paths whose matching results are cached by each DeepDelta instance
+    KEY_PATH_CACHE_SIZE = 8192
 
     def __init__(self,
                  config: DeltaConfig = None,
@@ -294,11 +681,67 @@ class DeepDelta:
         :param excluded_keys: list of keys to be excluded from comparison
         """
         self._config: DeltaConfig = config or DEFAULT_DELTA_CONFIG
+        # flags checked for every key or value are evaluated only once
+        self._key_case_ignored: bool = self._config.matches(DeltaConfig.KeyCaseIgnored)
+        self._key_space_trimmed: bool = self._config.matches(DeltaConfig.KeySpaceTrimmed)
+        self._value_case_ignored: bool = self._config.matches(DeltaConfig.ValueCaseIgnored)
+        self._value_space_trimmed: bool = self._config.matches(DeltaConfig.ValueSpaceTrimmed)
+        self._missing_as_none: bool = self._config.matches(DeltaConfig.MissingAsNone)
+        self._missing_value: Any = None if self._missing_as_none else DeepDelta.MISSING
+        self._id_as_key: bool = self._config.matches(DeltaConfig.IdAsKey)
+        self._keep_all_details: bool = self._config.matches(DeltaConfig.OutputKeepAllDetails)
+        self._output_with_flag: bool = self._config.matches(DeltaConfig.OutputWithFlag)
         self.output:  Callable[[bool, Any, Any], Any] = get_output(self._config)
+        # nested dicts and sequences are compared without recursion, unless any method comparing them is overridden
+        self._nests_iteratively: bool = all(getattr(type(self), name) is getattr(DeepDelta, name)
+                                            for name in ('compare_any', 'compare_dict', 'compare_sequence'))
+        if not self._nests_iteratively:
+            self._nest_dicts, self._nest_sequences = self.compare_dict, self.compare_sequence
+        # equal values are emitted without calling as_delta() and then filtered by delta_to_keep() unless either of
+        # them is overridden
+        self._delta_to_keep_overridden: bool = type(self).delta_to_keep is not DeepDelta.delta_to_keep
+        self._emit: Callable[[Dict, Any, bool, Any, Any], None] = get_emitter(self._config) \
+            if type(self).as_delta is DeepDelta.as_delta and not self._delta_to_keep_overridden \
+            else self._emit_as_delta
+        self._str_differ: Callable[[str, str], bool] = \
+            str_differ_of(self._value_case_ignored, self._value_space_trimmed)
         none_unequal_default: bool = self._config.matches(DeltaConfig.NoneUnequalDefault)
         self.typed_equal: Callable[[Any, Any], bool] = with_comparators(type_comparators, none_unequal_default)
         self.named_comparators = named_comparators or {}
         self.keys_excluded: List[Union[str, Pattern]] = list(excluded_keys)
+        # the key paths are checked without calling these methods unless they are overridden
+        self._is_excluded_overridden: bool = type(self).is_excluded is not DeepDelta.is_excluded
+        self._named_comparator_overridden: bool = type(self).get_named_comparator is not DeepDelta.get_named_comparator
+        self._keys_prepared: Optional[Tuple] = None
+        self._prepare_keys()
+
+    def _prepare_keys(self) -> None:
+        """Prepare the matchers of the named comparators and excluded keys with case_ignored applied, again only if
+        self.named_comparators or self.keys_excluded has been changed since they were prepared last time.
+        """
+        prepared = (tuple(self.named_comparators.items()), tuple(self.keys_excluded))
+        if prepared == self._keys_prepared:
+            return
+        self._keys_prepared = prepared
+        self._named_matchers: List[Tuple[Callable[[str, str], bool], Callable]] = \
+            [(compile_key_matcher(k, self._key_case_ignored), c) for k, c in prepared[0]]
+        self._excluded_matcher: Callable[[str, str], bool] = compile_keys_matcher(prepared[1], self._key_case_ignored)
+        # the same key paths are checked repeatedly: for both sides of a dict and for the sibling items of sequences,
+        # and nothing needs to be matched or cached in the common case of no named comparators or excluded keys
+        self._named_comparator_of: Callable[[str], Optional[Callable]] = \
+            lru_cache(maxsize=DeepDelta.KEY_PATH_CACHE_SIZE)(self._match_named_comparator) \
+            if self._named_matchers else _no_named_comparator
+        self._excluded: Callable[[str], bool] = \
+            lru_cache(maxsize=DeepDelta.KEY_PATH_CACHE_SIZE)(self._match_excluded) \
+            if prepared[1] else _not_excluded
+
+    def _key_path_checks(self) -> Tuple[Callable[[str], bool], Callable[[str], Optional[Callable]]]:
+        """Get the methods alike is_excluded() and get_named_comparator() to be called for many key paths, after the
+        keys are prepared once.
+        """
+        self._prepare_keys()
+        return (self.is_excluded if self._is_excluded_overridden else self._excluded,
+                self.get_named_comparator if self._named_comparator_overridden else self._named_comparator_of)
 
     def as_delta(self, as_dif: bool, lhs: Any, rhs: Any) -> Tuple:
         """Use the output rules&means defined in Output_Buffer of delta_output.py to summarize the comparison results.
@@ -312,6 +755,10 @@ class DeepDelta:
         """
         return self.output(as_dif, lhs, rhs)
 
+    def _emit_as_delta(self, container: Dict, key: Any, is_dif: bool, lhs: Any, rhs: Any) -> None:
+        """Put the delta of lhs and rhs summarized by self.as_delta() into the container with the key."""
+        container[key] = self.as_delta(is_dif, lhs, rhs)
+
     def get_named_comparator(self, key_path: str):
         """ Get the dedicated comparator for a given key_path to compare value pairs under the matched names.
 
@@ -321,10 +768,15 @@ class DeepDelta:
         :return: the FIRST matched comparator if the given key_path matching any str/pattern of the named comparator
             dictionary, otherwise None.
         """
-        case_ignored = self._config.matches(DeltaConfig.KeyCaseIgnored)
-        for k in self.named_comparators:
-            if key_matches(k, key_path, case_ignored):
-                return self.named_comparators[k]
+        self._prepare_keys()
+        return self._named_comparator_of(key_path)
+
+    def _match_named_comparator(self, key_path: str) -> Optional[Callable]:
+        """Find the first named comparator matched with the key_path without caching, see get_named_comparator()."""
+        folded_path = key_path.casefold() if self._key_case_ignored else key_path
+        for matches, comparator in self._named_matchers:
+            if matches(key_path, folded_path):
+                return comparator
         return None
 
     def is_excluded(self, key_path: str) -> bool:
@@ -334,11 +786,12 @@ class DeepDelta:
         :param key_path: the string representation of the current key to be compared, like '>key' or '>key1>sub_key2'.
         :return: True if the key_path shall be excluded explicitly, otherwise False.
         """
-        case_ignored = self._config.matches(DeltaConfig.KeyCaseIgnored)
-        for k in self.keys_excluded:
-            if key_matches(k, key_path, case_ignored):
-                return True
-        return False
+        self._prepare_keys()
+        return self._excluded(key_path)
+
+    def _match_excluded(self, key_path: str) -> bool:
+        """Check if the key_path matches any excluded key without caching, see is_excluded()."""
+        return self._excluded_matcher(key_path, key_path.casefold() if self._key_case_ignored else key_path)
 
     def compare_any(self, lhs: Any, rhs: Any, key_path: str = None) -> Union[None, Tuple, Dict, str]:
         """Compare any two values to see if they are different, then format it by calling self.as_delta().
@@ -358,25 +811,47 @@ class DeepDelta:
         :return: the tuple/dict/str to show if and how the delta is between lhs and rhs.
             By default: None if no difference, (lhs, rhs) if lhs is not regarded as equal to rhs.
         """
-        named_comparator = self.get_named_comparator(key_path := key_path or '')
+        self._prepare_keys()
+        resolved = self._resolve(lhs, rhs, key_path or '')
+        if type(resolved) is _Nested:
+            return self.compare_dict(resolved.lhs, resolved.rhs, resolved.path)
+        return resolved
+
+    def _nest_dicts(self, lhs: Mapping, rhs: Mapping, key_path: str) -> _Nested:
+        """Defer the comparison of two dicts to the stack of compare_dict()."""
+        return _Nested(lhs, rhs, key_path)
+
+    def _nest_sequences(self, lhs: Sequence, rhs: Sequence, key_path: str) -> _Nested:
+        """Defer the comparison of two sequences to the stack of compare_dict() once they are converted to dicts."""
+        return _Nested(*self.sequences_to_dicts(lhs, rhs), key_path)
+
+    def _resolve(self, lhs: Any, rhs: Any, key_path: str) -> Any:
+        """Compare two values like compare_any(), except that a _Nested is returned instead of comparing two dicts or
+        two sequences, so that nested values could be compared without recursion.
+
+        When compare_any(), compare_dict() or compare_sequence() is overridden, two dicts or two sequences are compared
+        by calling compare_dict() or compare_sequence() instead, and no _Nested is returned.
+        """
+        named_comparator = self.get_named_comparator(key_path) if self._named_comparator_overridden \
+            else self._named_comparator_of(key_path)
         if named_comparator:
             return self.as_delta(named_comparator(lhs, rhs, key_path), lhs, rhs)
-        elif lhs == rhs:
+        elif lhs is rhs or lhs == rhs:
             return self.as_delta(False, lhs, rhs)
 
-        value_space_trimmed = self._config.matches(DeltaConfig.ValueSpaceTrimmed)
-        if isinstance(lhs, str) and isinstance(rhs, str):
-            if value_case_ignored := self._config.matches(DeltaConfig.ValueCaseIgnored):
-                is_dif = ((lhs.strip().casefold() != rhs.strip().casefold())
-                          if value_space_trimmed else (lhs.casefold() != rhs.casefold()))
-            else:
-                is_dif = (lhs.strip() != rhs.strip()
-                          if value_space_trimmed else (lhs != rhs))
-            return self.as_delta(is_dif, lhs, rhs)
+        l_type, r_type = type(lhs), type(rhs)
+        if l_type is r_type:
+            if l_type is dict:
+                return self._nest_dicts(lhs, rhs, key_path)
+            elif l_type is list:
+                return self._nest_sequences(lhs, rhs, key_path)
+
+        if (l_type is str and r_type is str) or (isinstance(lhs, str) and isinstance(rhs, str)):
+            return self.as_delta(self._str_differ(lhs, rhs), lhs, rhs)
         if isinstance(lhs, Mapping) and isinstance(rhs, Mapping):
-            return self.compare_dict(lhs, rhs, key_path)
+            return self._nest_dicts(lhs, rhs, key_path)
         elif isinstance(lhs, Sequence) and isinstance(rhs, Sequence):
-            return self.compare_sequence(lhs, rhs, key_path)
+            return self._nest_sequences(lhs, rhs, key_path)
 
         typed_result = self.typed_equal(lhs, rhs)
         if isinstance(typed_result, bool):
@@ -393,35 +868,77 @@ class DeepDelta:
         :return: the tuple/dict/str to show if and how the delta is between lhs and rhs.
             By default: None if no difference, (lhs, rhs) if lhs is not regarded as equal to rhs.
         """
-        case_ignored = self._config.matches(DeltaConfig.KeyCaseIgnored)
-        key_space_trimmed = self._config.matches(DeltaConfig.KeySpaceTrimmed)
-        missing_as_none = self._config.matches(DeltaConfig.MissingAsNone)
-
-        # Duplicated keys under CaseIgnored/TrimSpace settings would be warned only,
-        l_keys = {k for k in lhs.keys() if not self.is_excluded(f'{dict_path}{DeepDelta.PATH_SEPARATOR}{k}')}
-        r_keys = {k for k in rhs.keys() if not self.is_excluded(f'{dict_path}{DeepDelta.PATH_SEPARATOR}{k}')}
-        all_keys = {normalize(k, case_ignored) for k in l_keys.union(r_keys)}
-        delta = {}
-        for key in all_keys:
-            key_path = f'{dict_path}{DeepDelta.PATH_SEPARATOR}{key}'
-            if self.is_excluded(key_path):
-                continue
-
-            lks = matched_keys(key, l_keys, case_ignored, key_space_trimmed)
-            rks = matched_keys(key, r_keys, case_ignored, key_space_trimmed)
-            # value of the last matched key would be used for comparison
-            l_value = lhs[lks[-1]] if len(lks)>0 else (None if missing_as_none else DeepDelta.MISSING)
-            r_value = rhs[rks[-1]] if len(rks)>0 else (None if missing_as_none else DeepDelta.MISSING)
-            named_comparator = self.get_named_comparator(key_path)
-            if named_comparator:
-                delta[key] = named_comparator(l_value, r_value, key_path)
-            elif l_value == r_value:
-                delta[key] = self.as_delta(False, l_value, r_value)
-            else:
-                delta[key] = self.compare_any(l_value, r_value, key_path)
-
-        result = {k: v for k, v in delta.items() if self.delta_to_keep(v)}
-        return result
+        missing = self._missing_value
+        # bound once since they are called for every key
+        is_excluded, get_named_comparator = self._key_path_checks()
+        emit, pair_keys = self._emit, self.pair_keys
+        # an overridden compare_any() is called for each value like before, and never returns a _Nested
+        resolve = self._resolve if self._nests_iteratively else self.compare_any
+
+        root = {}
+        # nested dicts are compared with a stack instead of recursion, each frame holds the dicts to be compared,
+        # their key path, and the delta dict of the parent frame with the key to put the delta of this frame
+        stack = [(lhs, rhs, dict_path, None, None)]
+        done = []
+        while stack:
+            l_dict, r_dict, path, parent_delta, slot = stack.pop()
+            # the key paths of all children share the same prefix
+            prefix = f'{path}{DeepDelta.PATH_SEPARATOR}'
+            delta = root if parent_delta is None else {}
+            for key, (l_key, r_key) in pair_keys(l_dict, r_dict, prefix).items():
+                key_path = f'{prefix}{key}'
+                if is_excluded(key_path):
+                    continue
+
+                l_value = missing if l_key is _ABSENT else l_dict[l_key]
+                r_value = missing if r_key is _ABSENT else r_dict[r_key]
+                named_comparator = get_named_comparator(key_path)
+                if named_comparator:
+                    delta[key] = named_comparator(l_value, r_value, key_path)
+                elif l_value == r_value:
+                    emit(delta, key, False, l_value, r_value)
+                else:
+                    resolved = resolve(l_value, r_value, key_path)
+                    # keep the position of the key, its value is assigned after the nested dicts are compared
+                    delta[key] = resolved
+                    if type(resolved) is _Nested:
+                        stack.append((resolved.lhs, resolved.rhs, resolved.path, delta, key))
+            done.append((delta, parent_delta, slot))
+
+        # children are always done after their parents, so they are filtered before their parents in reverse order
+        keep_all = self._keep_all_details and not self._delta_to_keep_overridden
+        delta_to_keep = self.delta_to_keep
+        for delta, parent_delta, slot in reversed(done):
+            result = delta if keep_all else {k: v for k, v in delta.items() if delta_to_keep(v)}
+            if parent_delta is None:
+                return result
+            parent_delta[slot] = result
+
+    def pair_keys(self, lhs: Mapping, rhs: Mapping, dict_path_prefix: str) -> Dict[Any, List]:
+        """Map the normalized forms of the keys that are not excluded to the original keys of both dicts.
+
+        Duplicated keys under CaseIgnored/TrimSpace settings would be warned only, and the last one would be used.
+        :param lhs: left-hand side dict whose keys to be paired.
+        :param rhs: right-hand side dict whose keys to be paired.
+        :param dict_path_prefix: the key path of the dicts followed by the PATH_SEPARATOR.
+        :return: dict with the normalized keys as keys, and [left original key, right original key] as values where
+            a missing key is denoted by _ABSENT.
+        """
+        case_ignored, key_space_trimmed = self._key_case_ignored, self._key_space_trimmed
+        is_excluded = self._key_path_checks()[0]
+        pairs = {}
+        for side, mapping in enumerate((lhs, rhs)):
+            for k in mapping.keys():
+                if is_excluded(f'{dict_path_prefix}{k}'):
+                    continue
+                normalized = normalize(k, case_ignored, key_space_trimmed)
+                pair = pairs.get(normalized)
+                if pair is None:
+                    pair = pairs[normalized] = [_ABSENT, _ABSENT]
+                elif pair[side] is not _ABSENT:
+                    logger.warning(f"Multiple matching of '{normalized}': {pair[side]},{k}")
+                pair[side] = k
+        return pairs
 
     def delta_to_keep(self, value: Any):
         """ Help method to check if the deltas shall be kept for reporting purposes.
@@ -435,11 +952,11 @@ class DeepDelta:
         :param value: the delta value could be discarded.
         :return: True to reserve the value, False to discard.
         """
-        if self._config.matches(DeltaConfig.OutputKeepAllDetails):
+        if self._keep_all_details:
             return True
         elif value is None:
             return False
-        elif self._config.matches(DeltaConfig.OutputWithFlag) and isinstance(value, tuple):
+        elif self._output_with_flag and isinstance(value, tuple):
             return value[0]
         elif isinstance(value, Collection):
             return len(value) != 0
@@ -460,16 +977,31 @@ class DeepDelta:
         :return: the tuple/dict/str to show if and how the delta is between lhs and rhs.
             By default: None if no difference, (lhs, rhs) if lhs is not regarded as equal to rhs.
         """
-        seq_path = seq_path or ''
-        case_ignored = self._config.matches(DeltaConfig.KeyCaseIgnored)
-        
-        is_key = is_key or (key_denoted_by_id if self._config.matches(DeltaConfig.IdAsKey) else None)
-        l_keys = guess_keys(lhs, is_key, case_ignored, *keys)
-        r_keys = guess_keys(rhs, is_key, case_ignored, *keys)
+        return self.compare_dict(*self.sequences_to_dicts(lhs, rhs, is_key, *keys), seq_path or '')
+
+    def sequences_to_dicts(self, lhs: Sequence, rhs: Sequence,
+                           is_key: Callable[[Any, bool], bool] = None,
+                           *keys: List[Any]) -> Tuple[Dict, Dict]:
+        """ Convert two sequences to dicts with the keys shared by their items, so they could be compared as dicts.
+
+        :param lhs: left-hand side sequence under comparison
+        :param rhs: right-hand side sequence under comparison
+        :param is_key: predicate to check if the name or property of the sequences shall be used as key.
+        :param keys: keys specified explicitly.
+        :return: the tuple of the dicts converted from lhs and rhs.
+        """
+        case_ignored = self._key_case_ignored
+
+        is_key = is_key or (key_denoted_by_id if self._id_as_key else None)
+        # materialize each side once so guess_keys() and sequence_to_dict() share the same list
+        l_items = lhs if isinstance(lhs, list) else list(lhs)
+        r_items = rhs if isinstance(rhs, list) else list(rhs)
+        l_keys = guess_keys(l_items, is_key, case_ignored, *keys)
+        r_keys = guess_keys(r_items, is_key, case_ignored, *keys)
         keys = l_keys.intersection(r_keys)
-        l_dict = sequence_to_dict(lhs, is_key, case_ignored, *keys)
-        r_dict = sequence_to_dict(rhs, is_key, case_ignored, *keys)
-        return self.compare_dict(l_dict, r_dict, seq_path)
+        l_dict = sequence_to_dict(l_items, is_key, case_ignored, *keys)
+        r_dict = sequence_to_dict(r_items, is_key, case_ignored, *keys)
+        return l_dict, r_dict
 
     @staticmethod
     def convert_to_compare(lhs: Sequence, rhs: Sequence,
@@ -65,8 +65,10 @@ class DeltaConfig(Flag):
         """Detect if this DeltaConfig instance has concerned flag.
 
         :param flags: the flags to be checked, can be used as mask if it is one bit flag.
-        :param mask: the optional mask to keep only concerned flag bits.
+        :param mask: the optional mask to keep only concerned flag bits, flags would be used as mask if it is None.
         :return: True if the concerned flags are matched, otherwise False.
         """
-        return self & (mask or flags) == flags
+        # compare the raw integer values to avoid creating Flag instances with '&'
+        flag_bits = flags._value_
+        return self._value_ & (flag_bits if mask is None else mask._value_) == flag_bits
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Tuple, Any, Optional, Dict, Callable
+from typing import Tuple, Any, Optional, Dict, Callable, Iterable, List
 
 from deepdelta.delta_config import DeltaConfig
 
@@ -12,90 +12,222 @@ TYPE_ABBREVIATIONS = {
 }
 
 
-class DeltaOutput:
+def get_value_abbrev(value: Any, abbreviations: Dict[type, str] = TYPE_ABBREVIATIONS) -> Any:
+    """Get the abbreviation of the value if its type is one of TYPE_ABBREVIATIONS, otherwise the value itself."""
+    return None if value is None else abbreviations.get(type(value), value)
 
-    LEFT_KEY = 'LEFT'
-    RIGHT_KEY = 'RIGHT'
-    STR_FORMAT = '{0} | {1}'
 
-    @staticmethod
-    def get_value_abbrev(value: Any) -> Optional:
-        if value is None:
-            return None
-        elif type(value) in TYPE_ABBREVIATIONS:
-            return TYPE_ABBREVIATIONS[type(value)]
-        else:
-            return value
+LEFT_KEY = 'LEFT'
+RIGHT_KEY = 'RIGHT'
+STR_FORMAT = '%s | %s'
 
-    @staticmethod
-    def no_flag_tuple_abbrev(is_dif: bool, left: Any, right: Any) -> Tuple:
-        return (DeltaOutput.get_value_abbrev(left), DeltaOutput.get_value_abbrev(right)) if is_dif else None
+# the output functions below are called once per compared value, so constants and helpers are bound as defaults
 
-    @staticmethod
-    def as_tuple(is_dif: bool, left: Any, right: Any) -> Tuple:
-        return is_dif, left, right
 
-    @staticmethod
-    def as_none_or_tuple(is_dif: bool, left: Any, right: Any) -> Tuple:
-        return (left, right) if is_dif else None
+def no_flag_tuple_abbrev(is_dif: bool, left: Any, right: Any, abbrev=get_value_abbrev) -> Optional[Tuple]:
+    return (abbrev(left), abbrev(right)) if is_dif else None
 
-    @staticmethod
-    def type_included(is_dif: bool, left: Any, right: Any) -> Tuple:
-        return is_dif, left, right, type(left), type(right)
 
-    @staticmethod
-    def as_none_or_str_raw(is_dif: bool, left: Any, right: Any) -> Optional[str]:
-        return DeltaOutput.STR_FORMAT.format(left, right) if is_dif else None
+def as_tuple(is_dif: bool, left: Any, right: Any) -> Tuple:
+    return is_dif, left, right
 
-    @staticmethod
-    def as_none_or_str(is_dif: bool, left: Any, right: Any) -> Optional[str]:
-        return DeltaOutput.STR_FORMAT.format(DeltaOutput.get_value_abbrev(left), DeltaOutput.get_value_abbrev(right)) \
-            if is_dif else None
 
-    @staticmethod
-    def as_none_or_dict_raw(is_dif: bool, left: Any, right: Any) -> Optional[Dict[str, Any]]:
-        if not is_dif:
-            return None
-        else:
-            return {DeltaOutput.LEFT_KEY: left,
-                    DeltaOutput.RIGHT_KEY: right}
+def as_none_or_tuple(is_dif: bool, left: Any, right: Any) -> Optional[Tuple]:
+    return (left, right) if is_dif else None
 
-    @staticmethod
-    def as_none_or_dict(is_dif: bool, left: Any, right: Any) -> Optional[Dict[str, Any]]:
-        if not is_dif:
-            return None
-        else:
-            return {DeltaOutput.LEFT_KEY: DeltaOutput.get_value_abbrev(left),
-                    DeltaOutput.RIGHT_KEY: DeltaOutput.get_value_abbrev(right)}
+
+def type_included(is_dif: bool, left: Any, right: Any, type_of=type) -> Tuple:
+    return is_dif, left, right, type_of(left), type_of(right)
+
+
+def as_none_or_str_raw(is_dif: bool, left: Any, right: Any, str_format=STR_FORMAT.__mod__) -> Optional[str]:
+    return str_format((left, right)) if is_dif else None
+
+
+def as_none_or_str(is_dif: bool, left: Any, right: Any,
+                   str_format=STR_FORMAT.__mod__, abbrev=get_value_abbrev) -> Optional[str]:
+    return str_format((abbrev(left), abbrev(right))) if is_dif else None
+
+
+def as_none_or_dict_raw(is_dif: bool, left: Any, right: Any,
+                        left_key=LEFT_KEY, right_key=RIGHT_KEY) -> Optional[Dict[str, Any]]:
+    return {left_key: left, right_key: right} if is_dif else None
+
+
+def as_none_or_dict(is_dif: bool, left: Any, right: Any,
+                    left_key=LEFT_KEY, right_key=RIGHT_KEY, abbrev=get_value_abbrev) -> Optional[Dict[str, Any]]:
+    return {left_key: abbrev(left), right_key: abbrev(right)} if is_dif else None
+
+
+class DeltaOutput:
+
+    LEFT_KEY = LEFT_KEY
+    RIGHT_KEY = RIGHT_KEY
+    STR_FORMAT = STR_FORMAT
+
+    get_value_abbrev = staticmethod(get_value_abbrev)
+    no_flag_tuple_abbrev = staticmethod(no_flag_tuple_abbrev)
+    as_tuple = staticmethod(as_tuple)
+    as_none_or_tuple = staticmethod(as_none_or_tuple)
+    type_included = staticmethod(type_included)
+    as_none_or_str_raw = staticmethod(as_none_or_str_raw)
+    as_none_or_str = staticmethod(as_none_or_str)
+    as_none_or_dict_raw = staticmethod(as_none_or_dict_raw)
+    as_none_or_dict = staticmethod(as_none_or_dict)
 
 
 Output_Buffer: Dict[DeltaConfig, Callable[[bool, Any, Any], Any]] = {
-    DeltaConfig.OutputDefault: DeltaOutput.no_flag_tuple_abbrev,
-
-    DeltaConfig.OutputWithFlag: DeltaOutput.as_tuple,
-    DeltaConfig.OutputAllDetails: DeltaOutput.type_included,
-    DeltaConfig.OutputNoneOrDict: DeltaOutput.as_none_or_dict,
-    DeltaConfig.OutputNoneOrDictRaw: DeltaOutput.as_none_or_dict_raw,
-    DeltaConfig.OutputDeltaAsStr: DeltaOutput.as_none_or_str,
-    DeltaConfig.OutputNoneOrStrRaw: DeltaOutput.as_none_or_str_raw,
+    DeltaConfig.OutputDefault: no_flag_tuple_abbrev,
+
+    DeltaConfig.OutputWithFlag: as_tuple,
+    DeltaConfig.OutputAllDetails: type_included,
+    DeltaConfig.OutputNoneOrDict: as_none_or_dict,
+    DeltaConfig.OutputNoneOrDictRaw: as_none_or_dict_raw,
+    DeltaConfig.OutputDeltaAsStr: as_none_or_str,
+    DeltaConfig.OutputNoneOrStrRaw: as_none_or_str_raw,
 }
 
 
+def abbreviated(output: Callable[[bool, Any, Any], Any]) -> Callable[[bool, Any, Any], Any]:
+    """Wrap the output function to get the values abbreviated before being output.
+
+    :param output: the output function accepting the flag of being different, the left and right values.
+    :return: the output function accepting the same arguments but applying the abbreviated values.
+    """
+    if output in _ABBREVIATED_FORMS:
+        return _ABBREVIATED_FORMS[output]
+
+    def abbreviated_output(is_dif: bool, left: Any, right: Any) -> Any:
+        return output(is_dif, get_value_abbrev(left), get_value_abbrev(right))
+
+    return abbreviated_output
+
+
+def _as_tuple_abbrev(is_dif: bool, left: Any, right: Any, abbrev=get_value_abbrev) -> Tuple:
+    return is_dif, abbrev(left), abbrev(right)
+
+
+def _type_included_abbrev(is_dif: bool, left: Any, right: Any, abbrev=get_value_abbrev, type_of=type) -> Tuple:
+    left, right = abbrev(left), abbrev(right)
+    return is_dif, left, right, type_of(left), type_of(right)
+
+
+# the built-in output functions with the abbreviations inlined, to be used instead of wrapping them by abbreviated()
+_ABBREVIATED_FORMS: Dict[Callable, Callable[[bool, Any, Any], Any]] = {
+    as_tuple: _as_tuple_abbrev,
+    type_included: _type_included_abbrev,
+    as_none_or_tuple: no_flag_tuple_abbrev,
+    as_none_or_str_raw: as_none_or_str,
+    as_none_or_dict_raw: as_none_or_dict,
+}
+
+_KEEP_ALL_DETAILS_BITS: int = DeltaConfig.OutputKeepAllDetails._value_
+
+# the output functions abbreviating the values by themselves, so they are never wrapped by abbreviated()
+_SELF_ABBREVIATING = {no_flag_tuple_abbrev, as_none_or_str, as_none_or_dict}
+
+
+class OutputRegistry:
+    """Registry of the output functions keyed by the output format bits of DeltaConfig, caching the output functions
+    resolved for the configs until any output function is registered again.
+    """
+    __slots__ = ('outputs', '_abbreviated', '_resolved')
+
+    def __init__(self, outputs: Dict[DeltaConfig, Callable[[bool, Any, Any], Any]]):
+        """Initialize the registry with the dict of output functions which could also be changed directly.
+
+        :param outputs: the dict with the masked DeltaConfig as keys and the output functions as values.
+        """
+        self.outputs = outputs
+        # the output functions wrapped by abbreviated(), keyed by the output functions to be wrapped
+        self._abbreviated: Dict[Callable, Callable[[bool, Any, Any], Any]] = {}
+        # the resolved outputs keyed by the values of the configs, together with the masked configs and the output
+        # functions they were resolved from, to detect changes of the outputs made directly
+        self._resolved: Dict[int, Tuple[DeltaConfig, Callable, Callable[[bool, Any, Any], Any]]] = {}
+
+    def register(self, config: DeltaConfig, output: Callable) -> Optional[Callable]:
+        """Associate the output function with the output format of the config.
+
+        :param config: the DeltaConfig whose output format bits to be associated with the output function.
+        :param output: the output function accepting the flag of being different, the left and right values.
+        :return: the output function associated previously, or None if there is no such output function.
+        """
+        output_config = config & DeltaConfig.OutputFormatMask
+        old_output = self.outputs.get(output_config)
+        self.outputs[output_config] = output
+        self._resolved.clear()
+        if old_output is not None and old_output not in self.outputs.values():
+            self._abbreviated.pop(old_output, None)
+        return old_output
+
+    def resolve(self, config: DeltaConfig) -> Callable[[bool, Any, Any], Any]:
+        """Get the output function of the config, with the values abbreviated unless OutputKeepAllDetails is set.
+
+        :param config: the DeltaConfig whose output format bits to be used to find the output function.
+        :return: the output function accepting the flag of being different, the left and right values.
+        """
+        resolved = self._resolved.get(config._value_)
+        if resolved is not None:
+            output_config, output, resolved_output = resolved
+            if self.outputs.get(output_config) is output:
+                return resolved_output
+
+        output_config = config & DeltaConfig.OutputFormatMask
+        if output_config not in self.outputs:
+            raise TypeError(f"Please specify output method to associate with {config}")
+
+        output = self.outputs[output_config]
+        if output in _SELF_ABBREVIATING or config._value_ & _KEEP_ALL_DETAILS_BITS:
+            resolved_output = output
+        else:
+            resolved_output = self._abbreviated.get(output)
+            if resolved_output is None:
+                resolved_output = self._abbreviated[output] = abbreviated(output)
+        self._resolved[config._value_] = (output_config, output, resolved_output)
+        return resolved_output
+
+
+_Registry = OutputRegistry(Output_Buffer)
+
+
 def set_output(config: DeltaConfig, output: Callable) -> Optional[Callable]:
-    output_config = config & DeltaConfig.OutputFormatMask
-    old_output = Output_Buffer[output_config] if output_config in Output_Buffer else None
-    Output_Buffer[output_config] = output
-    return old_output
+    return _Registry.register(config, output)
 
 
 def get_output(config: DeltaConfig) -> Callable[[bool, Any, Any], Any]:
-    output_config = config & DeltaConfig.OutputFormatMask
-    if output_config not in Output_Buffer:
-        raise TypeError(f"Please specify output method to associate with {config}")
+    return _Registry.resolve(config)
+
+
+# the output functions returning None for values that are not different
+_NONE_IF_SAME = {no_flag_tuple_abbrev, as_none_or_tuple, as_none_or_str_raw, as_none_or_str, as_none_or_dict_raw,
+                 as_none_or_dict}
 
-    output = Output_Buffer[output_config]
-    if config.matches(DeltaConfig.OutputKeepAllDetails):
-        return output
+
+def get_emitter(config: DeltaConfig) -> Callable[[Dict, Any, bool, Any, Any], None]:
+    """Get the function to put the output of two values into the container of deltas directly, which would skip the
+    values that are not different when their output would be None and is to be discarded.
+
+    :param config: the DeltaConfig to get the output function with get_output().
+    :return: function accepting the container, the key, the flag of being different, the left and right values.
+    """
+    output = get_output(config)
+    if output in _NONE_IF_SAME and not config._value_ & _KEEP_ALL_DETAILS_BITS:
+        def emit(container: Dict, key: Any, is_dif: bool, left: Any, right: Any) -> None:
+            if is_dif:
+                container[key] = output(True, left, right)
     else:
-        return lambda is_dif, left, right: \
-            output(is_dif, DeltaOutput.get_value_abbrev(left), DeltaOutput.get_value_abbrev(right))
+        def emit(container: Dict, key: Any, is_dif: bool, left: Any, right: Any) -> None:
+            container[key] = output(is_dif, left, right)
+    return emit
+
+
+def batch_apply(config: DeltaConfig, is_difs: Iterable[bool], lefts: Iterable, rights: Iterable) -> List:
+    """Output the deltas of multiple pairs of values with the output function resolved only once.
+
+    :param config: the DeltaConfig to get the output function with get_output().
+    :param is_difs: the flags to indicate if the pairs of values are different.
+    :param lefts: the left-hand side values.
+    :param rights: the right-hand side values.
+    :return: list of the outputs of the pairs of values in the same order.
+    """
+    return list(map(get_output(config), is_difs, lefts, rights))
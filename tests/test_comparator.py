@@ -1,10 +1,14 @@
+import gc
+import time
+import weakref
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 import pytest
 
 from deepdelta.comparator import as_float_str, compare_number_with_precision, with_precision, Comparator, compare_number_with_str, \
-    compare_bool_with_str, compare_datetime_with_str, compare_any_with_str, compare_any_with_none, are_equal
+    compare_bool_with_str, compare_datetime_with_str, compare_any_with_str, compare_any_with_none, are_equal, \
+    with_comparators, parse_datetime
 
 
 def test_as_float_str():
@@ -159,3 +163,92 @@ def test_are_equal():
     assert are_equal(None, False) is True
     assert are_equal('None', None) is True
     assert are_equal(None, 'None') is True
+
+
+def test_with_comparators():
+    typed_equal = with_comparators({(int, str): with_precision(0), float: with_precision(1)})
+    assert typed_equal(3, '3.4') is True
+    assert typed_equal('3.4', 3) is True
+    assert typed_equal(3, '3.6') is False
+    assert typed_equal(2.71, 2.74) is True
+    assert typed_equal(2.74, 2.76) is False
+    assert typed_equal('2.74', 2.71) is True
+    assert typed_equal([1], [1]) is NotImplemented
+    assert typed_equal(None, 'None') is NotImplemented
+
+
+def test_as_datetime_follows_updated_formats():
+    with pytest.raises(ValueError):
+        Comparator.as_datetime('08.07.2020')
+    Comparator.DATETIME_FORMATS.append('%d.%m.%Y')
+    try:
+        assert Comparator.as_datetime('08.07.2020') == datetime(2020, 7, 8)
+    finally:
+        Comparator.DATETIME_FORMATS.remove('%d.%m.%Y')
+
+
+def test_are_equal_same_object():
+    values = [1, 2]
+    assert are_equal(values, values) is True
+    assert are_equal(values, [1, 2]) is NotImplemented
+    assert with_comparators()(values, values) is True
+
+
+def test_are_equal_strings():
+    assert are_equal('abc', 'abc') is True
+    assert are_equal('abc', 'ABC') is False
+    assert are_equal('[]', []) is True
+    assert are_equal(datetime(2020, 10, 1), '2020-Oct-01') is True
+
+
+def test_compare_any_with_str_of_sub_types():
+    class Stamp(datetime):
+        pass
+
+    assert compare_any_with_str(Stamp(2020, 10, 1), '01/Oct/2020') is True
+    assert compare_any_with_str(Decimal('1.02'), '1.01') is False
+
+
+def test_compare_number_with_precision_boundaries():
+    assert compare_number_with_precision(2.544, 2.546) is False
+    assert compare_number_with_precision(2.546, 2.554) is True
+    assert compare_number_with_precision(6.5, 7, 0) is False
+    assert compare_number_with_precision(0.0, -0.0) is True
+    assert compare_number_with_precision(float('nan'), 'nan') is True
+
+
+def test_compare_with_none_custom_equality():
+    class EqualsAll:
+        def __eq__(self, other):
+            return True
+
+        __hash__ = object.__hash__
+
+    assert Comparator.compare_with_none(None, EqualsAll()) is False
+
+
+def test_with_comparators_releases_swapped_comparators():
+    def int_with_str(lhs, rhs):
+        return str(lhs) == rhs
+
+    typed_equal = with_comparators({(int, str): int_with_str})
+    assert typed_equal('1', 1) is True
+    reference = weakref.ref(int_with_str)
+    del int_with_str, typed_equal
+    gc.collect()
+    assert reference() is None
+
+
+def test_parse_datetime_of_adjacent_numeric_directives():
+    formats = ('%Y%m%d%H%M%S',)
+    assert parse_datetime('20200102030405', formats) == datetime(2020, 1, 2, 3, 4, 5)
+    started = time.perf_counter()
+    with pytest.raises(ValueError):
+        parse_datetime('1' * 80 + 'x', formats)
+    assert time.perf_counter() - started < 0.5
+
+
+def test_are_equal_in_reversed_order_without_wrapping(monkeypatch):
+    monkeypatch.setattr('deepdelta.comparator.swap_arguments', None)
+    assert are_equal('1', 1) is True
+    assert are_equal('1', 1, {(int, str): lambda lhs, rhs: (lhs, rhs) == (1, '1')}) is True
@@ -2,10 +2,12 @@ import re
 from datetime import datetime
 from pprint import pprint
 
+import pytest
+
 from deepdelta.comparator import Comparator, with_precision
 from deepdelta.delta_config import DeltaConfig
 from deepdelta.delta_output import Output_Buffer
-from deepdelta.core import DeepDelta, DEFAULT_DELTA_CONFIG
+from deepdelta.core import DeepDelta, DEFAULT_DELTA_CONFIG, normalize, str_differ_of
 
 
 class Employee:
@@ -130,6 +132,13 @@ def test_compare_with_exclusive_key_patterns():
     assert set(result['0'].keys()) == {'brand'} and set(result['1'].keys()) == {'name'}
 
 
+def test_compare_with_exclusive_key_patterns_of_inline_flags():
+    result = DeepDelta.compare(shopping_list, basket, DeltaConfig.KeyCaseIgnored, None, None,
+                               re.compile(r'(?i)>0>.*[CE|ME]'), re.compile('(?i)>1.*EX.+'))
+    pprint(result)
+    assert set(result['0'].keys()) == {'brand'} and set(result['1'].keys()) == {'name'}
+
+
 def test_compare_with_named_comparator():
     named = {
         'price': lambda l, r, p: float(l) >= float(r),
@@ -233,3 +242,105 @@ def test_compare_array_with_dif_type():
     right = { 'extra': [1, 2, 3]}
     delta = DeepDelta.compare(left, right)
     print(delta)
+
+
+def test_compare_keys_with_spaces_trimmed():
+    delta = DeepDelta.compare({' Name ': 'Ali', 'id': 1}, {'name': 'Tom', 'ID ': 1})
+    assert delta == {'name': ('Ali', 'Tom')}
+    delta = DeepDelta.compare({' Name ': 'Ali'}, {'name': 'Ali'}, DeltaConfig.KeyCaseIgnored)
+    assert delta == {' name ': ('Ali', DeepDelta.MISSING), 'name': (DeepDelta.MISSING, 'Ali')}
+
+
+def test_compare_same_object():
+    order = {'id': 100, 'products': [{'id': 1, 'name': 'Milk'}]}
+    assert DeepDelta.compare(order, order) is None
+    always_dif = {'products': lambda l, r, p: (l, r)}
+    delta = DeepDelta.compare(order, dict(order, id=101), None, None, always_dif)
+    assert delta == {'id': (100, 101), 'products': (order['products'], order['products'])}
+
+
+def test_normalize_date_keys():
+    for key in (datetime(2020, 8, 6, 12, 30), datetime(2021, 12, 31).date(), datetime(999, 1, 2)):
+        assert normalize(key) == key.strftime(DeepDelta.DEFAULT_DATE_FORMAT)
+        assert normalize(key, True) == key.strftime(DeepDelta.DEFAULT_DATE_FORMAT).casefold()
+    assert DeepDelta.compare({datetime(2020, 8, 6): 1}, {datetime(2020, 8, 6, 10): 2}) == {'2020-aug-06': (1, 2)}
+
+
+def test_str_differ_of():
+    assert str_differ_of(False, False)(' Tom', 'Tom') is True
+    assert str_differ_of(False, True)(' Tom ', 'Tom') is False
+    assert str_differ_of(False, True)(' Tom ', 'TOM') is True
+    assert str_differ_of(True, False)('Tom', 'TOM') is False
+    assert str_differ_of(True, False)('Tom ', 'TOM') is True
+    assert str_differ_of(True, True)(' Tom ', 'TOM') is False
+
+
+def test_normalize_str_keys():
+    assert normalize(' Name ', True, True) == 'name'
+    assert normalize('Straße', True) == 'strasse'
+    assert normalize('ΣΊΣΥΦΟΣ', True) == 'σίσυφοσ'
+    assert normalize(' Name ', False, False) == ' Name '
+
+
+def test_compare_deeply_nested():
+    depth = 300
+    lhs, rhs = {'leaf': 1}, {'leaf': 2}
+    for i in range(depth):
+        lhs, rhs = {'child': [lhs], 'name': i}, {'child': [rhs], 'name': i}
+    delta = DeepDelta.compare(lhs, rhs)
+    for i in range(depth):
+        assert list(delta.keys()) == ['child']
+        delta = delta['child']['0']
+    assert delta == {'leaf': (1, 2)}
+
+
+def test_compare_with_as_delta_overridden():
+    class FlaggedDelta(DeepDelta):
+        def as_delta(self, as_dif, lhs, rhs):
+            return 'changed' if as_dif else 'same'
+
+    delta = FlaggedDelta().compare_any({'a': 1, 'b': 2}, {'a': 1, 'b': 3})
+    assert delta == {'a': 'same', 'b': 'changed'}
+
+
+def test_compare_with_compare_methods_overridden():
+    class SequenceDelta(DeepDelta):
+        def compare_sequence(self, lhs, rhs, seq_path=None, is_key=None, *keys):
+            return 'custom-seq'
+
+    class PathDelta(DeepDelta):
+        def compare_dict(self, lhs, rhs, dict_path):
+            delta = super().compare_dict(lhs, rhs, dict_path)
+            return {**delta, 'at': dict_path} if delta else delta
+
+    lhs, rhs = {'a': [1], 'b': {'c': {'d': 1}}}, {'a': [2], 'b': {'c': {'d': 2}}}
+    assert SequenceDelta().compare_any(lhs, rhs) == {'a': 'custom-seq', 'b': {'c': {'d': (1, 2)}}}
+    assert PathDelta().compare_any(lhs, rhs) == \
+        {'a': {'0': (1, 2), 'at': '>a'}, 'b': {'c': {'d': (1, 2), 'at': '>b>c'}, 'at': '>b'}, 'at': ''}
+
+
+def test_compare_with_delta_to_keep_overridden():
+    class NoneKeptDelta(DeepDelta):
+        def delta_to_keep(self, value):
+            return value is None or super().delta_to_keep(value)
+
+    assert NoneKeptDelta().compare_any({'a': 1, 'b': 2}, {'a': 1, 'b': 3}) == {'a': None, 'b': (2, 3)}
+
+
+def test_change_excluded_keys_and_named_comparators():
+    delta = DeepDelta()
+    lhs, rhs = {'a': 1, 'b': 2, 'c': 3}, {'a': 2, 'b': 3, 'c': 4}
+    assert delta.compare_any(lhs, rhs) == {'a': (1, 2), 'b': (2, 3), 'c': (3, 4)}
+
+    delta.keys_excluded.append('b')
+    delta.named_comparators['a'] = lambda l, r, p: False
+    assert delta.is_excluded('>b') is True
+    assert delta.compare_any(lhs, rhs) == {'c': (3, 4)}
+
+    delta.keys_excluded = []
+    del delta.named_comparators['a']
+    assert delta.compare_any(lhs, rhs) == {'a': (1, 2), 'b': (2, 3), 'c': (3, 4)}
+
+
+def test_compare_dict_without_path():
+    assert DeepDelta().compare_dict({'a': {'b': 1}}, {'a': {'b': 2}}, None) == {'a': {'b': (1, 2)}}
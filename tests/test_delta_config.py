@@ -19,3 +19,7 @@ def test_matches_with_mask():
     assert config.matches(DeltaConfig.ValueSpaceTrimmed) is False
 
 
+def test_matches_with_zero_mask():
+    config = DeltaConfig.KeySpaceTrimmed | DeltaConfig.IdAsKey
+    assert config.matches(DeltaConfig.OutputDefault, DeltaConfig.OutputDefault) is True
+    assert config.matches(DeltaConfig.IdAsKey, DeltaConfig.OutputDefault) is False
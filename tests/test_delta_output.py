@@ -1,7 +1,10 @@
 from typing import Any
 
+import pytest
+
 from deepdelta.delta_config import DeltaConfig
-from deepdelta.delta_output import DeltaOutput, get_output, Output_Buffer, set_output
+from deepdelta.delta_output import DeltaOutput, get_output, Output_Buffer, set_output, batch_apply, abbreviated, \
+    get_emitter
 
 
 def test_get_value_abbrev():
@@ -104,3 +107,68 @@ def test_customised_output():
         assert output(False, 3.22, '3.22') == {"Delta": False, 'OLD': 3.22, 'New': '3.22'}
     finally:
         del Output_Buffer[DeltaConfig.OutputDeltaAsCustom]
+
+
+def test_get_output_reuses_abbreviated_output():
+    output = get_output(DeltaConfig.OutputDeltaAsStr)
+    assert output is DeltaOutput.as_none_or_str
+    assert get_output(DeltaConfig.OutputWithFlag) is get_output(DeltaConfig.OutputWithFlag)
+    assert output(True, [1], 'a') == '[...] | a'
+
+    old_output = set_output(DeltaConfig.OutputDeltaAsStr, DeltaOutput.as_none_or_dict_raw)
+    try:
+        assert get_output(DeltaConfig.OutputDeltaAsStr)(True, [1], 'a') == {'LEFT': '[...]', 'RIGHT': 'a'}
+    finally:
+        set_output(DeltaConfig.OutputDeltaAsStr, old_output)
+    assert get_output(DeltaConfig.OutputDeltaAsStr)(True, [1], 'a') == '[...] | a'
+
+
+def test_get_output_after_output_buffer_changed():
+    Output_Buffer[DeltaConfig.OutputDeltaAsCustom] = DeltaOutput.as_tuple
+    try:
+        assert get_output(DeltaConfig.OutputDeltaAsCustom)(True, [1], 2) == (True, '[...]', 2)
+        Output_Buffer[DeltaConfig.OutputDeltaAsCustom] = DeltaOutput.as_none_or_tuple
+        assert get_output(DeltaConfig.OutputDeltaAsCustom)(True, [1], 2) == ('[...]', 2)
+    finally:
+        del Output_Buffer[DeltaConfig.OutputDeltaAsCustom]
+    with pytest.raises(TypeError):
+        get_output(DeltaConfig.OutputDeltaAsCustom)
+
+
+def test_as_none_or_str_of_tuples():
+    assert DeltaOutput.as_none_or_str_raw(True, (1, 2), ()) == '(1, 2) | ()'
+    assert DeltaOutput.as_none_or_str_raw(True, '%s', None) == '%s | None'
+
+
+def test_batch_apply():
+    is_difs, lefts, rights = [True, False, True], [1, [2], {'a': 3}], [2, [2], None]
+    assert batch_apply(DeltaConfig.OutputDefault, is_difs, lefts, rights) == [(1, 2), None, ('{...}', None)]
+    assert batch_apply(DeltaConfig.OutputWithFlag, is_difs, lefts, rights) == \
+           [(True, 1, 2), (False, '[...]', '[...]'), (True, '{...}', None)]
+    assert batch_apply(DeltaConfig.OutputNoneOrStrRaw, iter(is_difs), lefts, rights) == \
+           ['1 | 2', None, "{'a': 3} | None"]
+
+
+def test_abbreviated_forms_of_output_functions():
+    for output in (DeltaOutput.as_tuple, DeltaOutput.type_included, DeltaOutput.as_none_or_tuple,
+                   DeltaOutput.as_none_or_str_raw, DeltaOutput.as_none_or_dict_raw, custom_output):
+        wrapped = abbreviated(output)
+        for is_dif, left, right in ((True, [1], {'a': 1}), (True, 2.1, None), (False, (1,), 1)):
+            assert wrapped(is_dif, left, right) == \
+                   output(is_dif, DeltaOutput.get_value_abbrev(left), DeltaOutput.get_value_abbrev(right))
+
+
+def test_get_emitter():
+    deltas = {}
+    emit = get_emitter(DeltaConfig.OutputDefault)
+    emit(deltas, 'a', False, 1, 1)
+    emit(deltas, 'b', True, [1], 2)
+    assert deltas == {'b': ('[...]', 2)}
+
+    emit = get_emitter(DeltaConfig.OutputNoneOrStrRaw)
+    emit(deltas, 'a', False, 1, 1)
+    assert deltas == {'a': None, 'b': ('[...]', 2)}
+
+    emit = get_emitter(DeltaConfig.OutputWithFlag)
+    emit(deltas, 'a', False, 1, 1)
+    assert deltas == {'a': (False, 1, 1), 'b': ('[...]', 2)}
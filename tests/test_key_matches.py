@@ -1,7 +1,8 @@
 import logging
 import re
 
-from deepdelta.core import key_matches, matched_keys, get_matched_keys, key_denoted_by_id
+from deepdelta.core import key_matches, matched_keys, get_matched_keys, key_denoted_by_id, compile_key_matcher, \
+    compile_keys_matcher, literal_prefix, exact_literal, normalize, matched_keys_count, any_matched_key
 
 logger = logging.getLogger(__name__)
 
@@ -109,3 +110,89 @@ def test_get_matched_keys_with_predicate():
     assert len(keys) == 6
 
 
+def test_compile_key_matcher_same_as_key_matches():
+    paths = ['>key1', '>Key1', '>abc>>key1', '>root>key1', '>abc>Key1', '>f>Leaf>More', '>KEY1>sub>leaF', '>leaf']
+    for kp in test_dict.keys():
+        for case_ignored in (True, False):
+            matches = compile_key_matcher(kp, case_ignored)
+            for path in paths:
+                folded = path.casefold() if case_ignored else path
+                assert matches(path, folded) == key_matches(kp, path, case_ignored)
+
+
+def test_compile_keys_matcher_same_as_any_key_matches():
+    paths = ['>key1', '>Key1', '>abc>>key1', '>root>key1', '>abc>Key1', '>f>Leaf>More', '>KEY1>sub>leaF', '>leaf',
+             '>Key2>x', '>a>b>c']
+    keys = list(test_dict.keys()) + [re.compile(r'>(a|b)>.*'), re.compile(r'>a>b>C', re.ASCII)]
+    for kps in (keys, keys[:3], keys[5:8], keys[-2:]):
+        for case_ignored in (True, False):
+            matches = compile_keys_matcher(kps, case_ignored)
+            for path in paths:
+                folded = path.casefold() if case_ignored else path
+                assert matches(path, folded) == any(key_matches(kp, path, case_ignored) for kp in kps)
+
+
+def test_key_matches_partial_path_case_ignored():
+    assert key_matches('Key2>Leaf', '>root>key2>leaf', True) is True
+    assert key_matches('Key2>Leaf', '>root>key2>leaf', False) is False
+    assert key_matches('a>Key2>Leaf', '>key2>leaf', True) is False
+    assert key_matches('STRASSE>x', '>Straße>X', True) is True
+
+
+def test_matched_keys_of_tuple_or_list():
+    keys = tuple(test_dict.keys())
+    for key_path in ('>key1', '>KEY1>sub>leaf', '>abc>Key2>leaf', '>x'):
+        for case_ignored in (True, False):
+            assert matched_keys(key_path, keys, case_ignored) == matched_keys(key_path, list(keys), case_ignored)
+    assert matched_keys('>key1', ('key1', ['key1']), False) == ['key1']
+
+
+def test_literal_prefix():
+    assert literal_prefix(re.compile(r'^>KEY1$', re.I)) == '>KEY1'
+    assert literal_prefix(re.compile(r'>key.*>Leaf')) == '>key'
+    assert literal_prefix(re.compile(r'^>?KEY2.*')) == ''
+    assert literal_prefix(re.compile(r'>ab*c')) == '>a'
+    assert literal_prefix(re.compile(r'>ab+c')) == '>ab'
+    assert literal_prefix(re.compile(r'>a|>b')) == ''
+    assert literal_prefix(re.compile(r'\>a')) == ''
+    assert literal_prefix(re.compile(r'>ä.*')) == ''
+
+
+def test_compile_key_matcher_of_patterns():
+    paths = ['>key1', '>KEY1', '>Kelvin', '>\u212aey1', '>ſtate', '>state', '>abc']
+    patterns = [re.compile(r'>KEY1', re.I), re.compile(r'>key\d'), re.compile(r'>STATE', re.I),
+                re.compile(r'>sta.*'), re.compile(r'>ab*c')]
+    for pattern in patterns:
+        matches = compile_key_matcher(pattern)
+        for path in paths:
+            assert matches(path, path) == key_matches(pattern, path)
+
+
+def test_exact_literal():
+    assert exact_literal(re.compile(r'^>KEY1$', re.I)) == '>KEY1'
+    assert exact_literal(re.compile(r'>key1')) == '>key1'
+    assert exact_literal(re.compile(r'^>?KEY2.*')) is None
+    assert exact_literal(re.compile(r'>key\$')) is None
+    assert exact_literal(re.compile(r'>ä')) is None
+
+
+def test_matched_keys_of_literal_patterns():
+    keys = (re.compile(r'^>KEY1$', re.I), re.compile(r'>key1'), re.compile(r'>STATE', re.I), 'key1', re.compile(r'>k.*'))
+    for key_path in ('>key1', '>KEY1', '>\u212aey1', '>ſtate', '>state', '>k', '>key2'):
+        for case_ignored in (True, False):
+            expected = [k for k in keys if key_matches(k, normalize(key_path, case_ignored), case_ignored)]
+            assert matched_keys(key_path, keys, case_ignored) == expected
+
+
+def test_matched_keys_count_and_any_matched_key():
+    for key_path in ('>key1', '>Key3>else>leaf', 'key2>', '>x'):
+        for case_ignored in (True, False):
+            matched = matched_keys(key_path, test_dict.keys(), case_ignored, True)
+            assert matched_keys_count(key_path, test_dict.keys(), case_ignored, True) == len(matched)
+            assert any_matched_key(key_path, test_dict.keys(), case_ignored, True) is bool(matched)
+
+
+def test_matched_keys_of_equal_keys_of_different_types():
+    assert matched_keys('>1', [1], False) == [1]
+    assert matched_keys('>1.0', [1.0], False) == [1.0]
+    assert matched_keys('>True', (True,), False) == [True]
@@ -1,6 +1,7 @@
 import logging
+from datetime import date
 
-from deepdelta.core import guess_keys, sequence_to_dict, key_denoted_by_id
+from deepdelta.core import DeepDelta, guess_keys, sequence_to_dict, key_denoted_by_id
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +65,23 @@ def test_guess_keys_with_keys_specified():
     keys2 = guess_keys(employees, None, True, 'name', 'employeeID')
     assert keys2 == keys
 
+    keys = guess_keys(dict_list, lambda name, case_ignored: name == 'gender', True, 'name', 'employeeID')
+    assert keys == {'name', 'employeeId'}
+
+
+def test_guess_keys_of_partially_shared_or_mixed_items():
+    items = [{'id': 1, 'name': 'Ali'}, {'id': 2, 'code': 'T'}, {'id': 3, 'name': 'Tom'}]
+    assert guess_keys(items, None, True, 'name', 'id') == {'id'}
+    assert guess_keys(items, None, True, 'name') == set()
+    assert guess_keys([dict_list[0], employees[0]], key_denoted_by_id) == set()
+
+
+def test_guess_keys_of_equal_keys_of_different_types():
+    assert guess_keys([{'1': 'a'}], None, False, 1) == {'1'}
+    assert guess_keys([{'1': 'a'}], None, False, True) == set()
+    assert guess_keys([{1: 'a'}], None, False, 1) == {1}
+    assert guess_keys([{True: 'a'}], None, False, True) == {True}
+
 
 def test_dicts_to_dict():
     d = sequence_to_dict(dict_list, key_denoted_by_id, True, 'employeeid')
@@ -82,3 +100,21 @@ def test_dicts_to_dict():
 
     d = sequence_to_dict(employees, lambda name, case_ignored: name == 'employeeID')
     assert '5' in d
+
+
+def test_iterator_to_dict():
+    d = sequence_to_dict(iter(dict_list), key_denoted_by_id, True, 'employeeid')
+    assert d == sequence_to_dict(dict_list, key_denoted_by_id, True, 'employeeid')
+    assert len(d) == len(dict_list)
+
+
+def test_key_denoted_by_id_of_names_not_str():
+    assert key_denoted_by_id('ID', True) is True
+    assert key_denoted_by_id(['x', 'id'], True) is False
+    date_format = DeepDelta.DEFAULT_DATE_FORMAT
+    try:
+        assert key_denoted_by_id(date(2020, 1, 2)) is False
+        DeepDelta.DEFAULT_DATE_FORMAT = 'id%Y'
+        assert key_denoted_by_id(date(2020, 1, 2)) is True
+    finally:
+        DeepDelta.DEFAULT_DATE_FORMAT = date_format